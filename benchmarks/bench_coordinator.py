@@ -0,0 +1,379 @@
+"""End-to-end benchmark of the coordinator and all six platforms.
+
+Every unit gets a ReclaimV2Coordinator and the entities of all platforms on
+an in-process Home Assistant instance. aiomqtt.Client is replaced by a fake
+that answers polls and lets the benchmark inject packets, so this runs
+offline. Run from the repository root with Home Assistant installed:
+
+    python benchmarks/bench_coordinator.py --units 20 --messages 200
+
+Reported per run:
+  latency   from a packet leaving the MQTT client to the last
+            async_write_ha_state it caused on that unit
+  blocking  event loop lag seen by a task sleeping 1 ms at a time
+  memory    traced Python memory per unit after setup and the growth of
+            the peak RSS per unit during the run
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from datetime import timedelta
+import importlib
+import inspect
+import json
+import logging
+from pathlib import Path
+import random
+import resource
+import ssl
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import MappingProxyType
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from homeassistant import config_entries  # noqa: E402
+from homeassistant.const import CONF_UNIQUE_ID  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant.helpers import (  # noqa: E402
+    device_registry as dr,
+    entity,
+    entity_registry as er,
+)
+from homeassistant.helpers.entity_platform import EntityPlatform  # noqa: E402
+
+from custom_components.reclaimenergy import PLATFORMS, reclaimv2  # noqa: E402
+from custom_components.reclaimenergy.const import (  # noqa: E402
+    CONF_CACERT_PATH,
+    CONF_CERT_PATH,
+    CONF_KEY_PATH,
+    DOMAIN,
+)
+from custom_components.reclaimenergy.coordinator import (  # noqa: E402
+    ReclaimV2Coordinator,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def register_image(rng: random.Random) -> dict[int, int]:
+    """Return plausible values for every register in modbus_map."""
+    image = {}
+    for name, (address, _, _) in reclaimv2.ReclaimState.modbus_map.items():
+        if name == "mode":
+            value = rng.randint(2, 9)
+        elif name == "mode8_day":
+            value = rng.randint(1, 7)
+        elif name.endswith(("_start", "_duration")):
+            value = rng.randint(3, 12) * 256
+        elif name.endswith("_temp") or name in ("water", "case"):
+            value = rng.randint(80, 120)
+        elif name == "pump":
+            value = 1
+        else:
+            value = rng.randint(0, 2000)
+        image[address] = value
+    return image
+
+
+class FakeMessage:
+    """A received MQTT message."""
+
+    def __init__(self, payload: str) -> None:
+        """Initialise message."""
+        self.payload = payload
+
+
+class FakeClient:
+    """In-process stand in for aiomqtt.Client, one per unit session."""
+
+    # command topic -> client, so the benchmark can inject into a unit
+    clients: dict[str, FakeClient] = {}
+    rng = random.Random()
+
+    def __init__(self, **kwargs: Any) -> None:
+        """Initialise client."""
+        self._messages: asyncio.Queue[FakeMessage] = asyncio.Queue()
+        self.topic: str | None = None
+        self.image = register_image(FakeClient.rng)
+        self.received: float | None = None
+
+    async def __aenter__(self) -> FakeClient:
+        """Connect."""
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        """Disconnect."""
+
+    async def subscribe(self, topic: str) -> None:
+        """Subscribe to the unit's status topic."""
+
+    async def publish(self, topic: str, payload: str, qos: int = 0) -> None:
+        """Answer reads from the register image and acknowledge writes."""
+        if self.topic is None:
+            self.topic = topic
+            FakeClient.clients[topic] = self
+        request = json.loads(payload)
+        if request["messageId"] == "write":
+            self.image[request["modbusReg"]] = request["modbusVal"][0]
+            self.inject(request)
+        elif request["modbusReg"] == 1:
+            self.inject_full()
+        else:
+            start, count = request["modbusReg"], request["modbusVal"][0]
+            values = [self.image.get(start + i, 0) for i in range(count)]
+            self.inject({"messageId": "read", "modbusReg": start, "modbusVal": values})
+
+    def inject(self, payload: dict[str, Any]) -> None:
+        """Queue a message for the unit."""
+        self._messages.put_nowait(FakeMessage(json.dumps(payload)))
+
+    def inject_full(self) -> None:
+        """Queue a full read of the register image."""
+        values = [v for item in sorted(self.image.items()) for v in item]
+        self.inject({"messageId": "read", "modbusReg": 1, "modbusVal": values})
+
+    @property
+    def pending(self) -> int:
+        """Return the number of undelivered messages."""
+        return self._messages.qsize()
+
+    @property
+    def messages(self):
+        """Yield messages, recording when each one leaves the client."""
+
+        async def _messages():
+            while True:
+                message = await self._messages.get()
+                self.received = time.perf_counter()
+                yield message
+
+        return _messages()
+
+
+class Recorder:
+    """Collect the time of the last state write of each unit."""
+
+    def __init__(self) -> None:
+        """Initialise recorder."""
+        self.last_write: dict[int, float] = {}
+        self.writes = 0
+
+    def install(self) -> None:
+        """Wrap Entity.async_write_ha_state."""
+        original = entity.Entity.async_write_ha_state
+        recorder = self
+
+        def async_write_ha_state(self: entity.Entity) -> None:
+            original(self)
+            if coordinator := getattr(self, "coordinator", None):
+                recorder.writes += 1
+                recorder.last_write[coordinator.api.unique_id] = time.perf_counter()
+
+        entity.Entity.async_write_ha_state = async_write_ha_state
+
+
+class LoopMonitor:
+    """Measure event loop lag with a task sleeping 1 ms at a time."""
+
+    def __init__(self) -> None:
+        """Initialise monitor."""
+        self.lags: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            self.lags.append(max(0.0, time.perf_counter() - start - 0.001))
+
+    def start(self) -> None:
+        """Start monitoring."""
+        self.lags.clear()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop monitoring."""
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+def config_entry(unique_id: int, config_dir: Path) -> config_entries.ConfigEntry:
+    """Create a config entry, passing only the arguments this version takes."""
+    arguments = {
+        "version": 1,
+        "minor_version": 1,
+        "domain": DOMAIN,
+        "title": f"Reclaim {unique_id}",
+        "data": {
+            CONF_UNIQUE_ID: str(unique_id),
+            CONF_CACERT_PATH: str(config_dir / "ca.pem"),
+            CONF_CERT_PATH: str(config_dir / "cert.pem"),
+            CONF_KEY_PATH: str(config_dir / "key.pem"),
+        },
+        "source": config_entries.SOURCE_USER,
+        "options": {},
+        "unique_id": str(unique_id),
+        "discovery_keys": MappingProxyType({}),
+        "subentries_data": None,
+    }
+    accepted = inspect.signature(config_entries.ConfigEntry).parameters
+    return config_entries.ConfigEntry(
+        **{key: value for key, value in arguments.items() if key in accepted}
+    )
+
+
+async def setup_unit(
+    hass: HomeAssistant, unique_id: int, config_dir: Path
+) -> ReclaimV2Coordinator:
+    """Set up the coordinator and all platforms of one unit."""
+    entry = config_entry(unique_id, config_dir)
+    hass.config_entries._entries[entry.entry_id] = entry
+    config_entries.current_entry.set(entry)
+    coordinator = ReclaimV2Coordinator(hass)
+    entry.runtime_data = coordinator
+
+    for domain in PLATFORMS:
+        module = importlib.import_module(f"custom_components.reclaimenergy.{domain}")
+        platform = EntityPlatform(
+            hass=hass,
+            logger=_LOGGER,
+            domain=domain,
+            platform_name=DOMAIN,
+            platform=module,
+            scan_interval=timedelta(seconds=30),
+            entity_namespace=None,
+        )
+        platform.config_entry = entry
+        await module.async_setup_entry(
+            hass, entry, platform._async_schedule_add_entities_for_entry
+        )
+    return coordinator
+
+
+async def settle(units: list[ReclaimV2Coordinator]) -> None:
+    """Wait until every injected message has been processed."""
+    while True:
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        busy = any(client.pending for client in FakeClient.clients.values()) or any(
+            len(coordinator.api._queue) for coordinator in units
+        )
+        if not busy:
+            return
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Return a percentile of sorted values."""
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def run(units: int, messages: int, interval: float, seed: int) -> None:
+    """Run the benchmark."""
+    rng = random.Random(seed)
+    # the fake client ignores the TLS context
+    reclaimv2.create_tls_context = lambda *files: ssl.create_default_context()
+    reclaimv2.aiomqtt.Client = FakeClient
+    FakeClient.rng = rng
+    recorder = Recorder()
+    recorder.install()
+
+    with tempfile.TemporaryDirectory() as directory:
+        config_dir = Path(directory)
+        for name in ("ca.pem", "cert.pem", "key.pem"):
+            (config_dir / name).touch()
+
+        hass = HomeAssistant(directory)
+        hass.config_entries = config_entries.ConfigEntries(hass, {})
+        entity.async_setup(hass)
+        await er.async_load(hass)
+        await dr.async_load(hass)
+
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        coordinators = [
+            # the low byte of a unit id is a checksum, not part of its topic
+            await setup_unit(hass, 10**16 + i * 256, config_dir)
+            for i in range(units)
+        ]
+        # wait for every session to connect and receive its first full read
+        while len(FakeClient.clients) < units:
+            await asyncio.sleep(0.01)
+        await hass.async_block_till_done()
+        await settle(coordinators)
+        setup_memory = tracemalloc.get_traced_memory()[0] - baseline
+        # tracing slows the loop down, the run is measured without it
+        tracemalloc.stop()
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        clients = list(FakeClient.clients.values())
+
+        latencies: list[float] = []
+        monitor = LoopMonitor()
+        monitor.start()
+        start = time.perf_counter()
+        for _ in range(messages):
+            for client in clients:
+                for address in client.image:
+                    if rng.random() < 0.3:
+                        client.image[address] = register_image(rng)[address]
+                client.inject_full()
+            await settle(coordinators)
+            for coordinator, client in zip(coordinators, clients):
+                written = recorder.last_write.get(coordinator.api.unique_id)
+                if written and client.received and written >= client.received:
+                    latencies.append(written - client.received)
+            if interval:
+                await asyncio.sleep(interval)
+        elapsed = time.perf_counter() - start
+        await monitor.stop()
+        run_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss
+
+        for coordinator in coordinators:
+            await coordinator.shutdown()
+        await hass.async_stop(force=True)
+
+    latencies.sort()
+    lags = sorted(monitor.lags)
+    print(f"{units} units x {messages} messages in {elapsed:.2f}s")
+    print(f"  state writes   {recorder.writes}")
+    print(
+        f"  latency        mean {statistics.mean(latencies) * 1e3:.3f}ms "
+        f"p99 {percentile(latencies, 0.99) * 1e3:.3f}ms "
+        f"max {latencies[-1] * 1e3:.3f}ms"
+    )
+    print(
+        f"  loop lag       mean {statistics.mean(lags) * 1e3:.3f}ms "
+        f"p99 {percentile(lags, 0.99) * 1e3:.3f}ms max {lags[-1] * 1e3:.3f}ms"
+    )
+    print(
+        f"  memory/unit    setup {setup_memory / units / 1024:.0f}KiB traced, "
+        f"run {run_rss / units:.0f}KiB peak RSS growth"
+    )
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--units", type=int, default=10)
+    parser.add_argument("--messages", type=int, default=100)
+    parser.add_argument(
+        "--interval", type=float, default=0.0, help="seconds between rounds"
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(run(args.units, args.messages, args.interval, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Benchmark decoding of read packets against the previous parser.
+
+Run from the repository root:
+
+    python benchmarks/bench_parse.py
+
+payload.py has no Home Assistant dependencies and is loaded directly so the
+benchmark runs without Home Assistant installed. The accelerated decoder is
+used when orjson is installed.
+"""
+
+import importlib.util
+import json
+from pathlib import Path
+import random
+import statistics
+import time
+
+PAYLOAD = (
+    Path(__file__).parent.parent / "custom_components" / "reclaimenergy" / "payload.py"
+)
+
+# registers in a full read of the controllers seen so far and a larger layout
+SIZES = (35, 120, 300)
+
+# registers decoded by ReclaimState
+WANTED = frozenset(range(1, 60, 2))
+
+
+def load_payload():
+    """Load payload.py without importing the integration package."""
+    spec = importlib.util.spec_from_file_location("payload", PAYLOAD)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def packet(rng: random.Random, registers: int) -> bytes:
+    """Return a full read packet as received from the broker."""
+    values = []
+    for address in range(1, registers * 2, 2):
+        values += [address, rng.randint(0, 65535)]
+    return json.dumps(
+        {"messageId": "read", "modbusReg": 1, "modbusVal": values}
+    ).encode()
+
+
+def previous(raw: bytes, wanted) -> dict[int, int]:
+    """Decode like the parser before payload.py."""
+    payload = json.loads(raw.decode())
+    if payload["messageId"] == "read" and payload["modbusReg"] == 1:
+        values = payload["modbusVal"]
+        if wanted is None:
+            return {values[i]: values[i + 1] for i in range(0, len(values), 2)}
+        return {
+            values[i]: values[i + 1]
+            for i in range(0, len(values), 2)
+            if values[i] in wanted
+        }
+    return {}
+
+
+def current(codec, raw: bytes, wanted) -> dict[int, int]:
+    """Decode like the parser now."""
+    payload = codec.loads(raw)
+    if payload["messageId"] == "read" and payload.get("modbusReg") == 1:
+        return codec.registers(payload["modbusVal"], wanted)
+    return {}
+
+
+def measure(decode, packets: list[bytes], rounds: int) -> list[float]:
+    """Return the time per packet of each round."""
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for raw in packets:
+            decode(raw)
+        timings.append((time.perf_counter() - start) / len(packets))
+    return timings
+
+
+def main() -> None:
+    """Decode packets of each size with both parsers."""
+    codec = load_payload()
+    rng = random.Random(1)
+    print(f"decoder: {codec.loads.__module__}")
+
+    for registers in SIZES:
+        packets = [packet(rng, registers) for _ in range(200)]
+        for wanted in (None, WANTED):
+            assert previous(packets[0], wanted) == current(codec, packets[0], wanted)
+            before = measure(lambda raw: previous(raw, wanted), packets, 50)
+            after = measure(lambda raw: current(codec, raw, wanted), packets, 50)
+            print(
+                f"{registers:4d} registers, {'filtered' if wanted else 'all':8s}: "
+                f"previous {statistics.median(before) * 1e6:6.1f}us, "
+                f"current {statistics.median(after) * 1e6:6.1f}us, "
+                f"{statistics.median(before) / statistics.median(after):.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Benchmark the heating planner over a year of synthetic tariffs.
+
+Run from the repository root:
+
+    python benchmarks/bench_planner.py
+
+planner.py has no Home Assistant dependencies and is loaded directly so the
+benchmark runs without Home Assistant installed.
+"""
+
+import importlib.util
+import math
+from pathlib import Path
+import random
+import statistics
+import time
+
+PLANNER = (
+    Path(__file__).parent.parent / "custom_components" / "reclaimenergy" / "planner.py"
+)
+
+
+def load_planner():
+    """Load planner.py without importing the integration package."""
+    spec = importlib.util.spec_from_file_location("planner", PLANNER)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def tariff(rng: random.Random) -> list[float]:
+    """Return hourly prices of a time of use tariff with some noise."""
+    prices = []
+    for hour in range(24):
+        if 7 <= hour < 9 or 17 <= hour < 21:
+            price = 0.45
+        elif 22 <= hour or hour < 6:
+            price = 0.18
+        else:
+            price = 0.28
+        prices.append(price * rng.uniform(0.9, 1.1))
+    return prices
+
+
+def solar(rng: random.Random, day: int) -> list[float]:
+    """Return an hourly solar forecast in kW following the seasons."""
+    peak = 3.0 + 2.0 * math.cos(2 * math.pi * day / 365) * rng.uniform(0.5, 1.0)
+    return [
+        max(0.0, peak * math.sin(math.pi * (hour - 6) / 13)) if 6 <= hour <= 19 else 0
+        for hour in range(24)
+    ]
+
+
+def main() -> None:
+    """Plan each hour of a year for both timer layouts."""
+    planner = load_planner()
+    rng = random.Random(1)
+    days = [(tariff(rng), solar(rng, day)) for day in range(365)]
+
+    for name, limits in (("mode 7", ((3, 12),)), ("mode 5", ((3, 12), (0, 12)))):
+        timings = []
+        cost = 0.0
+        for prices, pv in days:
+            for hour in range(24):
+                series = [prices[(hour + h) % 24] for h in range(planner.HORIZON)]
+                forecast = [pv[(hour + h) % 24] for h in range(planner.HORIZON)]
+                costs = planner.hourly_costs(series, forecast, 1.2, 0.05)
+                # a fresh planner so the cache does not hide the search
+                heating = planner.HeatingPlanner(*limits)
+                start = time.perf_counter()
+                plan = heating.plan(costs, rng.randint(2, 10), hour)
+                timings.append(time.perf_counter() - start)
+                cost += plan.cost
+
+        timings.sort()
+        print(
+            f"{name}: {len(timings)} plans, "
+            f"mean {statistics.mean(timings) * 1e6:.0f}us, "
+            f"p99 {timings[int(len(timings) * 0.99)] * 1e6:.0f}us, "
+            f"max {timings[-1] * 1e6:.0f}us, "
+            f"total {sum(timings):.2f}s, cost {cost:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""Benchmark recovery of the MQTT session from injected network faults.
+
+A ReclaimV2 client talks through FaultProxy to a broker, where a simulated
+controller answers its polls. The client polls and escalates missed polls
+like the coordinator, while the proxy injects the scheduled faults. Run from
+the repository root:
+
+    python benchmarks/bench_reconnect.py --duration 100 --poll 5
+
+A minimal broker is started in process unless --broker points at one. The
+broker, proxy and controller run on their own thread and event loop, so the
+CPU time reported is that of the client alone. Home Assistant is not needed,
+the integration requirements (aiomqtt, boto3) are.
+
+Reported per fault:
+  recover   from the end of the fault to the next full read received
+  connects  connection attempts from the start of the fault until then,
+            or until the next fault started
+  cpu       client CPU spent in those attempts
+and overall the full reads lost or corrupted, reconnects and errors. The
+client connects without TLS, so the CPU of the handshake is not included.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import importlib
+import json
+import logging
+from pathlib import Path
+import random
+import sys
+import threading
+import time
+import types
+from typing import Any
+
+import aiomqtt
+from aiomqtt import Client as MqttClient
+
+from fault_proxy import Fault, FaultProxy, address
+from local_broker import LocalBroker
+
+PACKAGE = Path(__file__).parent.parent / "custom_components" / "reclaimenergy"
+
+DEFAULT_FAULTS = [
+    Fault(10, "latency", 10, 0.5),
+    Fault(25, "loss", 10, 0.3),
+    Fault(40, "disconnect"),
+    Fault(50, "malformed", 10, 0.5),
+    Fault(65, "stall", 25),
+]
+
+# missed polls before resubscribing and reconnecting, as the coordinator does
+RESUBSCRIBE_AFTER = 2
+RECONNECT_AFTER = 3
+
+
+def load_reclaimv2() -> types.ModuleType:
+    """Import reclaimv2.py without importing the integration package."""
+    package = types.ModuleType("reclaimenergy")
+    package.__path__ = [str(PACKAGE)]
+    sys.modules["reclaimenergy"] = package
+    return importlib.import_module("reclaimenergy.reclaimv2")
+
+
+reclaimv2 = load_reclaimv2()
+
+
+class Controller:
+    """Answer reads from a register image and acknowledge writes."""
+
+    def __init__(self, command_topic: str, status_topic: str, seed: int) -> None:
+        """Initialise controller."""
+        self.command_topic = command_topic
+        self.status_topic = status_topic
+        self._rng = random.Random(seed)
+        self.image = {
+            register.address: self._rng.randint(0, 200)
+            for register in reclaimv2.ReclaimState.modbus_map.values()
+        }
+        self.full_reads = 0
+
+    def answer(self, request: dict[str, Any]) -> str:
+        """Return the response to a command."""
+        if request["messageId"] == "write":
+            self.image[request["modbusReg"]] = request["modbusVal"][0]
+            return json.dumps(request)
+        if request["modbusReg"] == 1:
+            self.full_reads += 1
+            for register in self.image:
+                if self._rng.random() < 0.2:
+                    self.image[register] = self._rng.randint(0, 200)
+            values = [v for item in sorted(self.image.items()) for v in item]
+        else:
+            start, count = request["modbusReg"], request["modbusVal"][0]
+            values = [self.image.get(start + i, 0) for i in range(count)]
+        response = {"messageId": "read", "modbusReg": request["modbusReg"]}
+        return json.dumps({**response, "modbusVal": values})
+
+    async def run(self, host: str, port: int) -> None:
+        """Serve commands, reconnecting to the broker when needed."""
+        while True:
+            try:
+                async with MqttClient(host, port) as client:
+                    await client.subscribe(self.command_topic)
+                    async for message in client.messages:
+                        response = self.answer(json.loads(message.payload))
+                        await client.publish(self.status_topic, response)
+            except aiomqtt.MqttError:
+                await asyncio.sleep(1)
+
+
+class Network(threading.Thread):
+    """Broker, fault proxy and controller on a thread of their own."""
+
+    def __init__(
+        self,
+        faults: list[Fault],
+        broker: tuple[str, int] | None,
+        controller: Controller,
+        seed: int,
+    ) -> None:
+        """Initialise network."""
+        super().__init__(daemon=True)
+        self.faults = faults
+        self.broker = broker
+        self.controller = controller
+        self.seed = seed
+        self.proxy: FaultProxy | None = None
+        self.ready = threading.Event()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._stopping: asyncio.Event | None = None
+
+    def run(self) -> None:
+        """Run the event loop of the thread."""
+        asyncio.run(self._main())
+
+    async def _main(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        broker = None
+        if self.broker is None:
+            broker = LocalBroker()
+            await broker.start()
+            host, port = "127.0.0.1", broker.port
+        else:
+            host, port = self.broker
+        self.proxy = FaultProxy(host, port, self.faults, self.seed)
+        await self.proxy.start()
+        controller = asyncio.create_task(self.controller.run(host, port))
+        self.ready.set()
+
+        await self._stopping.wait()
+        controller.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await controller
+        await self.proxy.stop()
+        if broker:
+            await broker.stop()
+
+    def stop(self) -> None:
+        """Stop the thread."""
+        self._loop.call_soon_threadsafe(self._stopping.set)
+        self.join()
+
+
+class Client(reclaimv2.MessageListener):
+    """Poll the controller and record when full reads arrive."""
+
+    def __init__(self, api: reclaimv2.ReclaimV2) -> None:
+        """Initialise client."""
+        self.api = api
+        self.received: list[float] = []
+        self.unanswered = 0
+
+    def on_message(self, state: reclaimv2.ReclaimState) -> None:
+        """Record full reads."""
+        if state.full:
+            self.received.append(time.monotonic())
+            self.unanswered = 0
+
+    async def poll(self, interval: float) -> None:
+        """Request updates, recovering like the coordinator after misses."""
+        while True:
+            if self.unanswered >= RECONNECT_AFTER:
+                await self.api.reconnect()
+            elif self.unanswered >= RESUBSCRIBE_AFTER:
+                await self.api.resubscribe()
+            self.unanswered += 1
+            await self.api.request_update()
+            await asyncio.sleep(interval)
+
+
+class TimedClient(aiomqtt.Client):
+    """aiomqtt.Client recording the CPU time of each connection attempt."""
+
+    # (monotonic time, thread CPU seconds) of every attempt
+    attempts: list[tuple[float, float]] = []
+
+    async def __aenter__(self) -> TimedClient:
+        """Connect, recording the CPU time used."""
+        started = time.monotonic()
+        cpu = time.thread_time()
+        try:
+            return await super().__aenter__()
+        finally:
+            TimedClient.attempts.append((started, time.thread_time() - cpu))
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Run the benchmark."""
+    reclaimv2.RECONNECT_DELAY = args.reconnect_delay
+    # only the client, the controller keeps the imported class
+    aiomqtt.Client = TimedClient
+    faults = sorted(args.fault or DEFAULT_FAULTS)
+    unique_id = 10**16
+    api = reclaimv2.ReclaimV2(
+        unique_id,
+        "",
+        "",
+        "",
+        publish_policies={
+            "poll": reclaimv2.PublishPolicy(qos=0, supersede=args.supersede)
+        },
+        hostname="127.0.0.1",
+        tls=False,
+    )
+    controller = Controller(api.command_topic, api.subscribe_topic, args.seed)
+    network = Network(faults, args.broker, controller, args.seed)
+    network.start()
+    await asyncio.get_running_loop().run_in_executor(None, network.ready.wait)
+    proxy = network.proxy
+    api.port = proxy.port
+
+    client = Client(api)
+    cpu = time.thread_time()
+    api.connect(client)
+    tasks = [asyncio.create_task(client.poll(args.poll))]
+
+    await asyncio.sleep(max(0.0, proxy.started + args.duration - time.monotonic()))
+    for task in tasks:
+        task.cancel()
+    await api.disconnect()
+    cpu = time.thread_time() - cpu
+    # let responses still in flight arrive at the controller's count
+    await asyncio.sleep(0.1)
+    network.stop()
+
+    start = proxy.started
+    attempts = TimedClient.attempts
+    print(f"{args.duration:.0f}s, poll every {args.poll}s, {len(faults)} faults")
+    for fault, following in zip(faults, [*faults[1:], None]):
+        end = start + fault.end
+        recovered = next((t for t in client.received if t >= end), None)
+        label = f"  {fault.at:5.0f}s {fault.kind:10s}"
+        if recovered is None:
+            print(f"{label} not recovered")
+            continue
+        # attempts after the next fault started are counted for that one
+        until = min(recovered, start + following.at) if following else recovered
+        during = [used for t, used in attempts if start + fault.at <= t <= until]
+        print(
+            f"{label} recover {recovered - end:6.2f}s, "
+            f"connects {len(during)}, cpu {sum(during) * 1e3:6.2f}ms"
+        )
+
+    metrics = api.metrics
+    received = metrics.full_reads
+    corrupted = metrics.decode_errors
+    lost = controller.full_reads - received - corrupted
+    print(
+        f"  full reads     sent {controller.full_reads}, received {received}, "
+        f"corrupted {corrupted}, lost {lost}"
+    )
+    print(
+        f"  proxy          dropped {proxy.dropped}, corrupted {proxy.corrupted}, "
+        f"aborted {proxy.aborted}, connections {proxy.connections}"
+    )
+    print(
+        f"  client cpu     {cpu * 1e3:.1f}ms, "
+        f"{sum(used for _, used in attempts) * 1e3:.1f}ms connecting"
+    )
+    print(
+        f"  client         connects {metrics.connects}/{len(attempts)} attempts, "
+        f"mqtt errors {metrics.mqtt_errors}, "
+        f"publish errors {metrics.publish_errors}, "
+        f"polls superseded {metrics.polls_superseded}"
+    )
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=100.0)
+    parser.add_argument("--poll", type=float, default=5.0, help="poll interval")
+    parser.add_argument(
+        "--fault",
+        type=Fault.parse,
+        action="append",
+        help="at:kind[:duration[:value]], replaces the default schedule",
+    )
+    parser.add_argument("--broker", type=address, help="host:port of a broker")
+    parser.add_argument(
+        "--reconnect-delay", type=float, default=reclaimv2.RECONNECT_DELAY
+    )
+    parser.add_argument(
+        "--supersede",
+        type=float,
+        default=reclaimv2.PUBLISH_POLICIES["poll"].supersede,
+        help="seconds an unanswered poll suppresses identical ones",
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(
+        format="%(relativeCreated)8.0f %(name)s %(message)s",
+        level=logging.DEBUG if args.verbose else logging.CRITICAL,
+    )
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""MQTT proxy injecting network faults between a client and a broker.
+
+The proxy forwards whole MQTT packets in both directions and applies the
+faults active at the time:
+
+  latency     delay every packet by value seconds
+  loss        drop PUBLISH packets with probability value
+  malformed   truncate the payload of PUBLISH packets sent to the client
+              with probability value
+  stall       forward nothing for the duration, connections stay open
+  disconnect  abort every open connection
+
+Faults are given as at:kind[:duration[:value]] with times in seconds from
+the start of the proxy. To run it on its own in front of a local broker:
+
+    python benchmarks/fault_proxy.py --upstream localhost:1883 --listen 1884 \\
+        --fault 10:latency:20:0.5 --fault 40:disconnect
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import random
+import time
+from typing import NamedTuple
+
+_LOGGER = logging.getLogger(__name__)
+
+PUBLISH = 3
+
+KINDS = ("latency", "loss", "malformed", "stall", "disconnect")
+
+
+class Fault(NamedTuple):
+    """A fault active from at for duration seconds."""
+
+    at: float
+    kind: str
+    duration: float = 0.0
+    value: float = 0.0
+
+    @classmethod
+    def parse(cls, text: str) -> Fault:
+        """Parse at:kind[:duration[:value]]."""
+        at, kind, *rest = text.split(":")
+        if kind not in KINDS:
+            raise ValueError(f"Unknown fault {kind}, expected one of {KINDS}")
+        return cls(float(at), kind, *(float(x) for x in rest))
+
+    @property
+    def end(self) -> float:
+        """Return when the fault is over."""
+        return self.at + self.duration
+
+
+def encode_length(length: int) -> bytes:
+    """Encode the remaining length of an MQTT fixed header."""
+    encoded = bytearray()
+    while True:
+        length, digit = divmod(length, 128)
+        encoded.append(digit | (0x80 if length else 0))
+        if not length:
+            return bytes(encoded)
+
+
+async def read_packet(reader: asyncio.StreamReader) -> bytes:
+    """Read one complete MQTT packet."""
+    packet = bytearray(await reader.readexactly(1))
+    length = 0
+    shift = 0
+    while True:
+        digit = (await reader.readexactly(1))[0]
+        packet.append(digit)
+        length |= (digit & 0x7F) << shift
+        if not digit & 0x80:
+            break
+        shift += 7
+    packet += await reader.readexactly(length)
+    return bytes(packet)
+
+
+def header_length(packet: bytes) -> int:
+    """Return the length of the fixed header of a packet."""
+    i = 1
+    while packet[i] & 0x80:
+        i += 1
+    return i + 1
+
+
+def truncate_payload(packet: bytes) -> bytes:
+    """Return a PUBLISH packet with the second half of its payload cut off."""
+    start = header_length(packet)
+    topic_length = int.from_bytes(packet[start : start + 2], "big")
+    variable = 2 + topic_length + (2 if packet[0] & 0x06 else 0)
+    body = packet[start : start + variable]
+    payload = packet[start + variable :]
+    body += payload[: len(payload) // 2]
+    return bytes(packet[:1]) + encode_length(len(body)) + body
+
+
+class FaultProxy:
+    """TCP proxy applying a schedule of faults to MQTT traffic."""
+
+    def __init__(
+        self,
+        upstream_host: str,
+        upstream_port: int,
+        faults: list[Fault],
+        seed: int = 1,
+    ) -> None:
+        """Initialise proxy."""
+        self.upstream_host = upstream_host
+        self.upstream_port = upstream_port
+        self.faults = sorted(faults)
+        self.port: int | None = None
+        self.started = 0.0
+        self.latency = 0.0
+        self.loss = 0.0
+        self.malformed = 0.0
+        self._flowing = asyncio.Event()
+        self._flowing.set()
+        self._rng = random.Random(seed)
+        self._writers: set[asyncio.StreamWriter] = set()
+        self._handlers: set[asyncio.Task] = set()
+        self._server: asyncio.Server | None = None
+        self._schedule: asyncio.Task | None = None
+        # counters
+        self.connections = 0
+        self.forwarded = 0
+        self.dropped = 0
+        self.corrupted = 0
+        self.aborted = 0
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        """Listen for clients and start the fault schedule."""
+        self._server = await asyncio.start_server(self._handle, host, port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self.started = time.monotonic()
+        self._schedule = asyncio.create_task(self._run_schedule())
+
+    async def stop(self) -> None:
+        """Stop the schedule and close all connections."""
+        if self._schedule:
+            self._schedule.cancel()
+        if self._server:
+            self._server.close()
+        self._flowing.set()
+        self._abort_all()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        if self._server:
+            await self._server.wait_closed()
+
+    def _abort_all(self) -> None:
+        for writer in list(self._writers):
+            writer.transport.abort()
+        self._writers.clear()
+
+    async def _run_schedule(self) -> None:
+        pending = []
+        for fault in self.faults:
+            await asyncio.sleep(max(0.0, self.started + fault.at - time.monotonic()))
+            _LOGGER.info(
+                "Fault %s for %ss (%s)", fault.kind, fault.duration, fault.value
+            )
+            if fault.kind == "disconnect":
+                self.aborted += len(self._writers) // 2
+                self._abort_all()
+                continue
+            if fault.kind == "stall":
+                self._flowing.clear()
+            else:
+                setattr(self, fault.kind, fault.value)
+            pending.append(asyncio.create_task(self._clear(fault)))
+        await asyncio.gather(*pending)
+
+    async def _clear(self, fault: Fault) -> None:
+        await asyncio.sleep(max(0.0, self.started + fault.end - time.monotonic()))
+        if fault.kind == "stall":
+            self._flowing.set()
+        else:
+            setattr(self, fault.kind, 0.0)
+
+    async def _handle(
+        self, client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter
+    ) -> None:
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        try:
+            await self._forward(client_reader, client_writer)
+        finally:
+            self._handlers.discard(handler)
+
+    async def _forward(
+        self, client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            broker_reader, broker_writer = await asyncio.open_connection(
+                self.upstream_host, self.upstream_port
+            )
+        except OSError as e:
+            _LOGGER.warning("Unable to connect upstream: %s", e)
+            client_writer.transport.abort()
+            return
+        self.connections += 1
+        self._writers |= {client_writer, broker_writer}
+        pumps = [
+            asyncio.create_task(self._pump(client_reader, broker_writer, False)),
+            asyncio.create_task(self._pump(broker_reader, client_writer, True)),
+        ]
+        # when either side goes away the other one is dropped as well
+        await asyncio.wait(pumps, return_when=asyncio.FIRST_COMPLETED)
+        for task in pumps:
+            task.cancel()
+        for writer in (client_writer, broker_writer):
+            self._writers.discard(writer)
+            writer.transport.abort()
+
+    async def _pump(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        to_client: bool,
+    ) -> None:
+        with contextlib.suppress(asyncio.IncompleteReadError, ConnectionError):
+            while True:
+                packet = await read_packet(reader)
+                await self._flowing.wait()
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                if packet[0] >> 4 == PUBLISH:
+                    if self._rng.random() < self.loss:
+                        self.dropped += 1
+                        continue
+                    if to_client and self._rng.random() < self.malformed:
+                        self.corrupted += 1
+                        packet = truncate_payload(packet)
+                writer.write(packet)
+                await writer.drain()
+                self.forwarded += 1
+
+
+def address(text: str) -> tuple[str, int]:
+    """Parse host:port."""
+    host, _, port = text.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+async def serve(upstream: str, listen: int, faults: list[Fault]) -> None:
+    """Run the proxy until interrupted."""
+    proxy = FaultProxy(*address(upstream), faults)
+    await proxy.start(port=listen)
+    _LOGGER.info("Proxying port %d to %s", proxy.port, upstream)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await proxy.stop()
+
+
+def main() -> None:
+    """Parse arguments and run the proxy."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--upstream", default="127.0.0.1:1883", help="broker")
+    parser.add_argument("--listen", type=int, default=1884)
+    parser.add_argument(
+        "--fault",
+        type=Fault.parse,
+        action="append",
+        default=[],
+        help="at:kind[:duration[:value]]",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(serve(args.upstream, args.listen, args.fault))
+
+
+if __name__ == "__main__":
+    main()
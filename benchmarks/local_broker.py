@@ -0,0 +1,113 @@
+"""Minimal in-process MQTT 3.1.1 broker for offline benchmarks.
+
+Only what the integration and the benchmarks use is supported: exact topic
+subscriptions, QoS 0 delivery (QoS 1 publishes are acknowledged) and keep
+alive pings. Use a real broker such as mosquitto for anything else.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+
+from fault_proxy import PUBLISH, encode_length, header_length, read_packet
+
+CONNECT = 1
+SUBSCRIBE = 8
+UNSUBSCRIBE = 10
+PINGREQ = 12
+DISCONNECT = 14
+
+
+def _topics(data: bytes) -> list[tuple[str, int]]:
+    """Return the (topic, option byte) pairs of a (un)subscribe payload."""
+    topics = []
+    i = 0
+    while i < len(data):
+        length = int.from_bytes(data[i : i + 2], "big")
+        topic = data[i + 2 : i + 2 + length].decode()
+        i += 2 + length
+        option = data[i] if i < len(data) else 0
+        topics.append((topic, option))
+        i += 1
+    return topics
+
+
+class LocalBroker:
+    """Route PUBLISH packets to the clients subscribed to their topic."""
+
+    def __init__(self) -> None:
+        """Initialise broker."""
+        self.port: int | None = None
+        self._server: asyncio.Server | None = None
+        self._clients: set[asyncio.StreamWriter] = set()
+        self._handlers: set[asyncio.Task] = set()
+        self._subscribers: dict[str, set[asyncio.StreamWriter]] = {}
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        """Start listening."""
+        self._server = await asyncio.start_server(self._handle, host, port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        """Stop listening and drop all clients."""
+        if self._server:
+            self._server.close()
+        for writer in list(self._clients):
+            writer.transport.abort()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        if self._server:
+            await self._server.wait_closed()
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        topics: set[str] = set()
+        self._clients.add(writer)
+        self._handlers.add(handler := asyncio.current_task())
+        with contextlib.suppress(asyncio.IncompleteReadError, ConnectionError):
+            while True:
+                packet = await read_packet(reader)
+                kind = packet[0] >> 4
+                body = packet[header_length(packet) :]
+                if kind == CONNECT:
+                    writer.write(b"\x20\x02\x00\x00")
+                elif kind == PUBLISH:
+                    self._publish(writer, packet, body)
+                elif kind == SUBSCRIBE:
+                    subscribed = _topics(body[2:])
+                    for topic, _ in subscribed:
+                        topics.add(topic)
+                        self._subscribers.setdefault(topic, set()).add(writer)
+                    granted = bytes(len(subscribed))
+                    writer.write(
+                        b"\x90" + encode_length(2 + len(granted)) + body[:2] + granted
+                    )
+                elif kind == UNSUBSCRIBE:
+                    for topic, _ in _topics(body[2:]):
+                        self._subscribers.get(topic, set()).discard(writer)
+                    writer.write(b"\xb0\x02" + body[:2])
+                elif kind == PINGREQ:
+                    writer.write(b"\xd0\x00")
+                elif kind == DISCONNECT:
+                    break
+                await writer.drain()
+        for topic in topics:
+            self._subscribers[topic].discard(writer)
+        self._clients.discard(writer)
+        self._handlers.discard(handler)
+        writer.transport.abort()
+
+    def _publish(
+        self, writer: asyncio.StreamWriter, packet: bytes, body: bytes
+    ) -> None:
+        qos = (packet[0] >> 1) & 0x03
+        length = int.from_bytes(body[:2], "big")
+        topic = body[2 : 2 + length].decode()
+        payload = body[2 + length + (2 if qos else 0) :]
+        if qos:
+            writer.write(b"\x40\x02" + body[2 + length : 4 + length])
+        forward = body[: 2 + length] + payload
+        message = bytes([PUBLISH << 4]) + encode_length(len(forward)) + forward
+        for subscriber in list(self._subscribers.get(topic, ())):
+            subscriber.write(message)
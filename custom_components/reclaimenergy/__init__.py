@@ -2,11 +2,19 @@
 
 from __future__ import annotations
 
+import contextlib
+import os
+
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
+from homeassistant.const import CONF_UNIQUE_ID, Platform
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 
-from .coordinator import ReclaimV2Coordinator
+from .const import DOMAIN
+from .coordinator import ReclaimV2Coordinator, history_path
+from .services import async_setup_services
+from .websocket_api import async_setup_websocket_api
 
 PLATFORMS: list[Platform] = [
     Platform.BINARY_SENSOR,
@@ -17,17 +25,38 @@ PLATFORMS: list[Platform] = [
     Platform.TIME,
 ]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Reclaim Energy services and websocket commands."""
+
+    async_setup_services(hass)
+    async_setup_websocket_api(hass)
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Reclaim Energy from a config entry."""
 
     coordinator = ReclaimV2Coordinator(hass=hass)
     entry.runtime_data = coordinator
+    await coordinator.async_load_profile()
+    if coordinator.statistics:
+        await coordinator.statistics.async_load()
+
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     return True
 
 
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry when its options change."""
+
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
 
@@ -35,3 +64,13 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         await entry.runtime_data.shutdown()
 
     return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the register history of a deleted config entry."""
+
+    path = history_path(hass, entry.data[CONF_UNIQUE_ID])
+    # with the file of a previous layout and any interrupted prune
+    for suffix in ("", ".old", ".new"):
+        with contextlib.suppress(FileNotFoundError):
+            await hass.async_add_executor_job(os.remove, f"{path}{suffix}")
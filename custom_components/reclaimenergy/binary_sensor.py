@@ -1,38 +1,59 @@
 """Binary sensor for Heat Pump State."""
 
+from dataclasses import dataclass
 import logging
+from typing import Any
 
 from homeassistant.components.binary_sensor import (
     BinarySensorDeviceClass,
     BinarySensorEntity,
+    BinarySensorEntityDescription,
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .entity import ReclaimV2Entity
+from .entity import ReclaimV2EntityDescription, ReclaimV2RegisterEntity
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True, kw_only=True)
+class ReclaimV2BinarySensorEntityDescription(
+    BinarySensorEntityDescription, ReclaimV2EntityDescription
+):
+    """Describes a boolean status register."""
+
+
+BINARY_SENSORS: tuple[ReclaimV2BinarySensorEntityDescription, ...] = (
+    ReclaimV2BinarySensorEntityDescription(
+        key="heatpump_state",
+        translation_key="heatpump_state",
+        register="pump",
+        device_class=BinarySensorDeviceClass.RUNNING,
+        icon="mdi:heat-pump",
+    ),
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the binary_sensor platform."""
-    async_add_entities([HeatPumpSensor(coordinator=entry.runtime_data)])
+    async_add_entities(
+        ReclaimV2BinarySensor(entry.runtime_data, description)
+        for description in BINARY_SENSORS
+    )
 
 
-class HeatPumpSensor(ReclaimV2Entity, BinarySensorEntity):
-    """Represents the current state of the heat pump."""
+class ReclaimV2BinarySensor(ReclaimV2RegisterEntity, BinarySensorEntity):
+    """Represents a status register of the heat pump."""
 
-    _attr_device_class = BinarySensorDeviceClass.RUNNING
-    _attr_translation_key = "heatpump_state"
-    _attr_icon = "mdi:heat-pump"
+    entity_description: ReclaimV2BinarySensorEntityDescription
 
     @callback
-    def _handle_coordinator_update(self) -> None:
-        if hasattr(self.coordinator.data, "pump"):
-            self._attr_is_on = self.coordinator.data.pump
-            self.async_write_ha_state()
+    def _update_value(self, value: Any) -> None:
+        self._attr_is_on = value
+        self.async_write_ha_state()
@@ -9,9 +9,14 @@ from typing import Any
 
 import voluptuous as vol
 
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
+from homeassistant.config_entries import (
+    ConfigEntry,
+    ConfigFlow,
+    ConfigFlowResult,
+    OptionsFlow,
+)
 from homeassistant.const import CONF_UNIQUE_ID
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
 
 from .const import (
@@ -21,6 +26,8 @@ from .const import (
     CONF_CACERT_PATH,
     CONF_CERT_PATH,
     CONF_KEY_PATH,
+    CONF_LONG_TERM_STATISTICS,
+    CONF_ON_DEMAND,
     DOMAIN,
     KEY_FILENAME,
     NAME,
@@ -43,18 +50,25 @@ def obtain_and_save_aws_keys(cacertpath: str, certpath: str, keypath: str) -> bo
         _LOGGER.warning("Keys already exists, not regenerating")
         return True
 
+    return rotate_aws_keys(cacertpath, certpath, keypath)
+
+
+def rotate_aws_keys(cacertpath: str, certpath: str, keypath: str) -> bool:
+    """Obtain new AWS Credentials, replacing any existing files."""
+
     result = obtain_aws_keys()
     if not result:
         return False
 
-    with open(cacertpath, "w", encoding="utf8") as f:
-        f.write(AWS_IOT_ROOT_CERT)
-
-    with open(certpath, "w", encoding="utf8") as f:
-        f.write(result[1])
-
-    with open(keypath, "w", encoding="utf8") as f:
-        f.write(result[2])
+    # write to temporary files first so readers never see a partial file
+    for path, data in (
+        (cacertpath, AWS_IOT_ROOT_CERT),
+        (certpath, result[1]),
+        (keypath, result[2]),
+    ):
+        with open(f"{path}.new", "w", encoding="utf8") as f:
+            f.write(data)
+        os.replace(f"{path}.new", path)
 
     return True
 
@@ -114,6 +128,39 @@ class ConfigFlow(ConfigFlow, domain=DOMAIN):
             step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
         )
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        """Create the options flow."""
+        return ReclaimOptionsFlow()
+
+
+class ReclaimOptionsFlow(OptionsFlow):
+    """Handle Reclaim Energy options."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        options = self.config_entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_ON_DEMAND, default=options.get(CONF_ON_DEMAND, False)
+                    ): bool,
+                    vol.Optional(
+                        CONF_LONG_TERM_STATISTICS,
+                        default=options.get(CONF_LONG_TERM_STATISTICS, False),
+                    ): bool,
+                }
+            ),
+        )
+
 
 class InvalidAuth(HomeAssistantError):
     """Error to indicate unable to authenticate."""
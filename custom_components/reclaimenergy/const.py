@@ -3,9 +3,13 @@
 DOMAIN = "reclaimenergy"
 NAME = "Reclaim V2"
 
+EVENT_WRITE_ROLLBACK = f"{DOMAIN}_write_rollback"
+
 CONF_CACERT_PATH = "cacert_path"
 CONF_CERT_PATH = "cert_path"
 CONF_KEY_PATH = "key_path"
+CONF_ON_DEMAND = "on_demand"
+CONF_LONG_TERM_STATISTICS = "long_term_statistics"
 
 CACERT_FILENAME = "AmazonRootCA1.pem"
 CERT_FILENAME = "reclaim_cert.pem"
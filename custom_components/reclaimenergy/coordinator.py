@@ -1,19 +1,71 @@
 """ReclaimV2 DataUpdateCoordinator."""
 
+from __future__ import annotations
+
+import asyncio
+from collections import deque
 import contextlib
 from datetime import timedelta
 import logging
+import time
+from typing import TYPE_CHECKING, Any
 
-from homeassistant.const import CONF_UNIQUE_ID
-from homeassistant.core import HomeAssistant
+from homeassistant.const import CONF_UNIQUE_ID, EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import STORAGE_DIR
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
-from .const import CONF_CACERT_PATH, CONF_CERT_PATH, CONF_KEY_PATH, DOMAIN
-from .reclaimv2 import MessageListener, ReclaimState, ReclaimV2
+from .const import (
+    CONF_CACERT_PATH,
+    CONF_CERT_PATH,
+    CONF_KEY_PATH,
+    CONF_LONG_TERM_STATISTICS,
+    CONF_ON_DEMAND,
+    DOMAIN,
+)
+from .discovery import KNOWN_REGISTERS, RegisterDiscovery, async_get_profiles
+from .fleet import async_get_fleet
+from .history import RegisterHistory
+from .payload import Layout
+from .planner import HeatingRateEstimator
+from .reclaimv2 import FAST_POLL_BLOCKS, MessageListener, ReclaimState, ReclaimV2
+from .scheduler import async_get_scheduler
+from .statistics import ReclaimStatistics
+
+if TYPE_CHECKING:
+    from .optimizer import HeatingOptimizer
 
 _LOGGER = logging.getLogger(__name__)
 
+FAST_UPDATE_INTERVAL = 30
+SLOW_UPDATE_INTERVAL = 300
+
+# in fast mode only every Nth poll reads the full register block
+FULL_READ_EVERY = 10
+
+# unanswered polls before entities become unavailable
+UNAVAILABLE_AFTER_MISSED = 2
+
+# reconnects attempted before relying on regular polls only
+MAX_RECOVERY_RECONNECTS = 3
+
+# how often the credential files are checked for changes
+TLS_REFRESH_INTERVAL = timedelta(hours=1)
+
+# how often buffered history records are written and old ones are dropped
+HISTORY_FLUSH_INTERVAL = timedelta(minutes=5)
+HISTORY_PRUNE_INTERVAL = timedelta(days=1)
+HISTORY_RETENTION = timedelta(days=400)
+
+# packets kept in memory for websocket clients, 3 hours of fast polling
+RECENT_PACKETS = 360
+
+
+def history_path(hass: HomeAssistant, unique_id: int | str) -> str:
+    """Return the register history file of a unit."""
+    return hass.config.path(STORAGE_DIR, DOMAIN, f"history_{unique_id}.bin")
+
 
 class ReclaimMessageListener(MessageListener):
     """Process incoming messages."""
@@ -24,8 +76,28 @@ class ReclaimMessageListener(MessageListener):
 
     def on_message(self, state: ReclaimState) -> None:
         """Handle incoming messages."""
+        # partial reads hold only some of these, water arrives in its own block
         with contextlib.suppress(AttributeError):
-            self.coordinator.set_update_interval(fast=state.pump or state.power)
+            self.coordinator.water = state.water
+        pump = getattr(state, "pump", None)
+        power = getattr(state, "power", None)
+        if pump is not None or power is not None:
+            self.coordinator.set_update_interval(fast=bool(pump or power))
+        water = self.coordinator.water
+        if pump is not None and power is not None and water is not None:
+            self.coordinator.heating.update(time.monotonic(), water, power, bool(pump))
+        if not state.ack:
+            self.coordinator.unanswered_polls = 0
+            self.coordinator.recovery_reconnects = 0
+            now = time.time()
+            self.coordinator.recent.append((now, state.data))
+            if self.coordinator.history.append(now, state.data):
+                self.coordinator.async_flush_history()
+            if self.coordinator.statistics:
+                self.coordinator.statistics.add(now, state)
+        if state.full:
+            self.coordinator.async_observe_layout(state)
+        self.coordinator.fleet.async_update(self.coordinator.api.unique_id, state)
         self.coordinator.async_set_updated_data(state)
 
 
@@ -47,37 +119,241 @@ class ReclaimV2Coordinator(DataUpdateCoordinator[ReclaimState]):
             self.config_entry.data[CONF_CACERT_PATH],
             self.config_entry.data[CONF_CERT_PATH],
             self.config_entry.data[CONF_KEY_PATH],
+            on_demand=self.config_entry.options.get(CONF_ON_DEMAND, False),
         )
 
         self.api.connect(ReclaimMessageListener(self))
         self._fast_updates = False
-        self._cancel_updates = None
+        self._polls = 0
+        self.unanswered_polls = 0
+        self.recovery_reconnects = 0
+
+        self.history = RegisterHistory(history_path(hass, self.api.unique_id))
+        self._history_flush: asyncio.Task | None = None
+        # (time, registers) of the latest packets, oldest first
+        self.recent: deque[tuple[float, dict[int, int]]] = deque(maxlen=RECENT_PACKETS)
 
-        self.set_update_interval(fast=False)
+        self.statistics: ReclaimStatistics | None = None
+        if self.config_entry.options.get(CONF_LONG_TERM_STATISTICS, False):
+            if "recorder" in hass.config.components:
+                self.statistics = ReclaimStatistics(hass, self)
+            else:
+                _LOGGER.warning("Long-term statistics need the recorder")
+
+        # signature of the register layout once its profile is applied
+        self.profile: str | None = None
+        self.discovery: RegisterDiscovery | None = None
+        self._profiles = async_get_profiles(hass)
+        self._profile_task: asyncio.Task | None = None
+
+        self.fleet = async_get_fleet(hass)
+
+        self.heating = HeatingRateEstimator()
+        # last water temperature received, for the heating rate and planning
+        self.water: float | None = None
+        self.optimizer: HeatingOptimizer | None = None
+
+        self._scheduler = async_get_scheduler(hass)
+        self._scheduler.async_add(
+            self.api.unique_id, SLOW_UPDATE_INTERVAL, self._async_request_update
+        )
+
+        self._cancel_tls_refresh = async_track_time_interval(
+            hass, self._async_refresh_tls, TLS_REFRESH_INTERVAL, cancel_on_shutdown=True
+        )
+        self._cancel_history_flush = async_track_time_interval(
+            hass,
+            self._async_flush_history_interval,
+            HISTORY_FLUSH_INTERVAL,
+            cancel_on_shutdown=True,
+        )
+        self._cancel_history_prune = async_track_time_interval(
+            hass,
+            self._async_prune_history,
+            HISTORY_PRUNE_INTERVAL,
+            cancel_on_shutdown=True,
+        )
+        # entries are not unloaded when Home Assistant stops
+        self.config_entry.async_on_unload(
+            hass.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_STOP, self._async_flush_history_interval
+            )
+        )
 
     def set_update_interval(self, fast: bool) -> None:
         """Adjust the update interval."""
 
-        # timer is already correct
-        if self._cancel_updates and self._fast_updates == fast:
+        # a register value may be passed, compare as bool
+        fast = bool(fast)
+        # interval is already correct
+        if self._fast_updates == fast:
             return
 
-        # cancel existing timer and start a new one
-        if self._cancel_updates:
-            self._cancel_updates()
-
-        self._cancel_updates = async_track_time_interval(
-            self.hass,
-            self._async_request_update,
-            timedelta(seconds=30 if fast else 300),
-            cancel_on_shutdown=True,
+        self._scheduler.async_set_interval(
+            self.api.unique_id, FAST_UPDATE_INTERVAL if fast else SLOW_UPDATE_INTERVAL
         )
+        self.api.keep_connected(fast)
         self._fast_updates = fast
+        self._polls = 1 if fast else 0
+
+    @property
+    def fast_updates(self) -> bool:
+        """Return True when polling at the fast interval."""
+        return self._fast_updates
+
+    async def _async_request_update(self):
+        if self.unanswered_polls:
+            await self._async_recover()
+        self.unanswered_polls += 1
+
+        if self._fast_updates and self._polls % FULL_READ_EVERY and not self._stale:
+            await self.api.request_registers(FAST_POLL_BLOCKS)
+        else:
+            await self.api.request_update()
+        self._polls += 1
+
+    @property
+    def _stale(self) -> bool:
+        return self.unanswered_polls > 1
+
+    async def _async_recover(self) -> None:
+        """Escalate recovery while polls go unanswered.
+
+        The first missed poll is simply requested again as a full read, then
+        the status topic is resubscribed and finally the session is
+        reconnected, up to MAX_RECOVERY_RECONNECTS times.
+        """
+        missed = self.unanswered_polls
+
+        if missed >= UNAVAILABLE_AFTER_MISSED and self.last_update_success:
+            _LOGGER.warning("No response to %d polls, marking unavailable", missed)
+            self.last_update_success = False
+            self.fleet.async_remove(self.api.unique_id)
+            self.async_update_listeners()
+
+        if missed == 2:
+            _LOGGER.debug("Resubscribing after %d missed polls", missed)
+            await self.api.resubscribe()
+        elif missed > 2 and self.recovery_reconnects < MAX_RECOVERY_RECONNECTS:
+            _LOGGER.debug("Reconnecting after %d missed polls", missed)
+            self.recovery_reconnects += 1
+            await self.api.reconnect()
+
+    async def _async_refresh_tls(self, _):
+        if await self.api.refresh_tls_context():
+            _LOGGER.info("Credentials changed, using them from the next reconnect")
+
+    async def async_load_profile(self) -> None:
+        """Apply the register profile the unit had last, before it is seen."""
+        cached = await self._profiles.async_unit_profile(self.api.unique_id)
+        if cached is not None and self.profile is None and not self.discovery:
+            self._use_profile(*cached)
 
-    async def _async_request_update(self, _):
+    @callback
+    def async_observe_layout(self, state: ReclaimState) -> None:
+        """Look at a full read for discovery or to apply the register profile."""
+        if self.discovery:
+            self.discovery.observe(state.data)
+            return
+        if self.profile is not None and not self.api.layout_matched:
+            # the firmware changed, this read was decoded whole
+            _LOGGER.info("Register layout %s changed", self.profile)
+            self.profile = None
+            self.api.layout = None
+        if self.profile is None and self._profile_task is None:
+            self._profile_task = self.config_entry.async_create_background_task(
+                self.hass,
+                self._async_apply_profile(tuple(state.data)),
+                f"{DOMAIN} register profile",
+            )
+
+    async def _async_apply_profile(self, addresses: tuple[int, ...]) -> None:
+        """Record the layout and only decode its known registers from now on."""
+        try:
+            signature, profile, created = await self._profiles.async_learn(
+                addresses, self.api.unique_id
+            )
+        finally:
+            self._profile_task = None
+        if self.discovery:
+            return
+        if created:
+            _LOGGER.info(
+                "New register layout %s, decoding %d of %d registers",
+                signature,
+                len(KNOWN_REGISTERS.keys() & addresses),
+                len(addresses),
+            )
+            if profile["missing"]:
+                _LOGGER.warning(
+                    "Registers missing from layout %s: %s",
+                    signature,
+                    ", ".join(profile["missing"]),
+                )
+        self._use_profile(signature, profile)
+
+    @callback
+    def _use_profile(self, signature: str, profile: dict[str, Any]) -> None:
+        self.profile = signature
+        self.api.layout = Layout(profile["addresses"], KNOWN_REGISTERS)
+
+    async def async_start_discovery(self) -> None:
+        """Record every register of the following full reads."""
+        self.discovery = RegisterDiscovery()
+        self.api.layout = None
+        self.profile = None
         await self.api.request_update()
 
+    async def async_stop_discovery(self) -> dict[str, Any]:
+        """Finish discovery, keep and return its report."""
+        report = self.discovery.report()
+        self.discovery = None
+        await self._profiles.async_save_discovery(report)
+        # the profile is applied again from the next full read
+        return report
+
+    @callback
+    def async_flush_history(self) -> asyncio.Task:
+        """Write buffered history records in the background."""
+        records = self.history.take()
+        previous = self._history_flush
+
+        async def _async_write() -> None:
+            # keep the records in order behind an earlier flush
+            if previous:
+                await previous
+            try:
+                await self.hass.async_add_executor_job(self.history.write, records)
+            except OSError as e:
+                _LOGGER.warning("Unable to write register history: %s", e)
+
+        self._history_flush = self.config_entry.async_create_background_task(
+            self.hass, _async_write(), f"{DOMAIN} history flush"
+        )
+        return self._history_flush
+
+    async def _async_flush_history_interval(self, _) -> None:
+        await self.async_flush_history()
+
+    async def _async_prune_history(self, _) -> None:
+        await self.async_flush_history()
+        before = time.time() - HISTORY_RETENTION.total_seconds()
+        try:
+            dropped = await self.hass.async_add_executor_job(self.history.prune, before)
+        except OSError as e:
+            _LOGGER.warning("Unable to prune register history: %s", e)
+        else:
+            _LOGGER.debug("Dropped %d history records", dropped)
+
     async def shutdown(self):
         """Shutdown the API."""
+        self._scheduler.async_remove(self.api.unique_id)
+        self._cancel_tls_refresh()
+        self._cancel_history_flush()
+        self._cancel_history_prune()
+        self.fleet.async_remove(self.api.unique_id)
+        await self.async_flush_history()
+        if self.optimizer:
+            self.optimizer.async_stop()
         if self.api:
             await self.api.disconnect()
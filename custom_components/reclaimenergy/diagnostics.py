@@ -0,0 +1,30 @@
+"""Diagnostics support for the Reclaim Energy integration."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_UNIQUE_ID
+from homeassistant.core import HomeAssistant
+
+TO_REDACT = {CONF_UNIQUE_ID}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = entry.runtime_data
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "fast_updates": coordinator.fast_updates,
+        "unanswered_polls": coordinator.unanswered_polls,
+        "recovery_reconnects": coordinator.recovery_reconnects,
+        "metrics": coordinator.api.metrics.as_dict(),
+        "register_profile": coordinator.profile,
+        "discovery": coordinator.discovery.report() if coordinator.discovery else None,
+        "registers": coordinator.data.data if coordinator.data else None,
+    }
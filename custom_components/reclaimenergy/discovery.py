@@ -0,0 +1,201 @@
+"""Register discovery and per-layout register profiles.
+
+A full read packet holds many more registers than ReclaimState.modbus_map
+decodes. Discovery records every register of each full read and which known
+registers changed together with it, to help identify what they mean.
+
+Controllers running the same firmware return the same set of registers, so
+the sorted register addresses are hashed into a signature identifying the
+layout. A profile is stored per signature with the addresses in the order
+the controller sends them and the units last seen with it. Once the layout
+of a unit is known, from its last profile at startup, the decoder picks the
+known registers by position from full reads with exactly those addresses.
+Any other full read is decoded whole and profiled again.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from collections.abc import Sequence
+import hashlib
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .reclaimv2 import ReclaimState
+
+DATA_PROFILES = f"{DOMAIN}_profiles"
+STORAGE_KEY = f"{DOMAIN}.register_profiles"
+STORAGE_VERSION = 1
+
+# distinct values remembered per register before only counting changes
+MAX_DISTINCT = 16
+
+# known registers reported as changing together with an unknown one
+MAX_CO_CHANGES = 3
+
+KNOWN_REGISTERS = {
+    register.address: name for name, register in ReclaimState.modbus_map.items()
+}
+
+
+def layout_signature(addresses: Any) -> str:
+    """Return the signature of a register layout."""
+    joined = ",".join(str(address) for address in sorted(addresses))
+    return hashlib.sha1(joined.encode()).hexdigest()[:12]
+
+
+class RegisterStats:
+    """What has been seen of one register."""
+
+    __slots__ = ("minimum", "maximum", "changes", "values")
+
+    def __init__(self, value: int) -> None:
+        """Initialise with the first value."""
+        self.minimum = value
+        self.maximum = value
+        self.changes = 0
+        self.values: set[int] | None = {value}
+
+    def add(self, value: int, changed: bool) -> None:
+        """Record a value."""
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+        if changed:
+            self.changes += 1
+        if self.values is not None:
+            self.values.add(value)
+            if len(self.values) > MAX_DISTINCT:
+                self.values = None
+
+
+class RegisterDiscovery:
+    """Record all registers of full reads and how they change."""
+
+    def __init__(self) -> None:
+        """Initialise discovery."""
+        self.started = dt_util.utcnow()
+        self.packets = 0
+        self._previous: dict[int, int] = {}
+        self._stats: dict[int, RegisterStats] = {}
+        # unknown address -> known register names changing with it
+        self._co_changes: dict[int, Counter[str]] = {}
+
+    def observe(self, data: dict[int, int]) -> None:
+        """Add an unfiltered full read."""
+        self.packets += 1
+        changed = [
+            address
+            for address, value in data.items()
+            if address in self._previous and self._previous[address] != value
+        ]
+        for address, value in data.items():
+            if (stats := self._stats.get(address)) is None:
+                self._stats[address] = RegisterStats(value)
+            else:
+                stats.add(value, self._previous.get(address) != value)
+
+        known = [KNOWN_REGISTERS[a] for a in changed if a in KNOWN_REGISTERS]
+        if known:
+            for address in changed:
+                if address not in KNOWN_REGISTERS:
+                    self._co_changes.setdefault(address, Counter()).update(known)
+        self._previous = data
+
+    def report(self) -> dict[str, Any]:
+        """Return what has been discovered."""
+        registers = {}
+        for address, stats in sorted(self._stats.items()):
+            co_changes = self._co_changes.get(address, Counter())
+            registers[str(address)] = {
+                "name": KNOWN_REGISTERS.get(address),
+                "min": stats.minimum,
+                "max": stats.maximum,
+                "changes": stats.changes,
+                "values": sorted(stats.values) if stats.values is not None else None,
+                "changes_with": [
+                    name for name, _ in co_changes.most_common(MAX_CO_CHANGES)
+                ],
+            }
+        return {
+            "signature": layout_signature(self._stats),
+            "started": self.started.isoformat(),
+            "packets": self.packets,
+            "registers": registers,
+        }
+
+
+class RegisterProfiles:
+    """Register profiles of all layouts seen, shared by all units."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialise profiles."""
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._profiles: dict[str, Any] | None = None
+        self._lock = asyncio.Lock()
+
+    async def _async_profiles(self) -> dict[str, Any]:
+        async with self._lock:
+            if self._profiles is None:
+                self._profiles = await self._store.async_load() or {}
+        return self._profiles
+
+    async def async_learn(
+        self, addresses: Sequence[int], unique_id: int | None = None
+    ) -> tuple[str, dict[str, Any], bool]:
+        """Return (signature, profile, created) of the layout of a full read.
+
+        With a unique_id the addresses are in the order the unit sent them
+        and the layout is remembered as the one of that unit.
+        """
+        signature = layout_signature(addresses)
+        profiles = await self._async_profiles()
+        if created := signature not in profiles:
+            profiles[signature] = {
+                "addresses": list(addresses),
+                "missing": sorted(
+                    name
+                    for address, name in KNOWN_REGISTERS.items()
+                    if address not in addresses
+                ),
+                "first_seen": dt_util.utcnow().isoformat(),
+            }
+        profile = profiles[signature]
+        if unique_id is not None:
+            profile["addresses"] = list(addresses)
+            for other in profiles.values():
+                if unique_id in (units := other.get("units", [])):
+                    units.remove(unique_id)
+            profile.setdefault("units", []).append(unique_id)
+        if created or unique_id is not None:
+            self._store.async_delay_save(lambda: profiles, 10)
+        return signature, profile, created
+
+    async def async_unit_profile(
+        self, unique_id: int
+    ) -> tuple[str, dict[str, Any]] | None:
+        """Return (signature, profile) of the layout a unit had last."""
+        for signature, profile in (await self._async_profiles()).items():
+            if unique_id in profile.get("units", ()):
+                return signature, profile
+        return None
+
+    async def async_save_discovery(self, report: dict[str, Any]) -> None:
+        """Keep the result of a discovery with the profile of its layout."""
+        _, profile, _ = await self.async_learn(
+            [int(address) for address in report["registers"]]
+        )
+        profile["discovery"] = report
+        self._store.async_delay_save(lambda: self._profiles, 10)
+
+
+@callback
+def async_get_profiles(hass: HomeAssistant) -> RegisterProfiles:
+    """Return the register profiles shared by all config entries."""
+    if DATA_PROFILES not in hass.data:
+        hass.data[DATA_PROFILES] = RegisterProfiles(hass)
+    return hass.data[DATA_PROFILES]
@@ -1,11 +1,29 @@
 """ReclaimV2 Components."""
 
+from abc import abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
 from homeassistant.const import CONF_UNIQUE_ID
+from homeassistant.core import CALLBACK_TYPE, callback
 from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.entity import EntityDescription
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN
+from .const import DOMAIN, EVENT_WRITE_ROLLBACK
 from .coordinator import ReclaimV2Coordinator
+from .reclaimv2 import WRITE_ACK_TIMEOUT, ReclaimState
+
+
+@dataclass(frozen=True, kw_only=True)
+class ReclaimV2EntityDescription(EntityDescription):
+    """Describes a ReclaimV2 entity backed by a register in modbus_map."""
+
+    # name in ReclaimState.modbus_map, defaults to the key
+    register: str | None = None
 
 
 class ReclaimV2Entity(CoordinatorEntity[ReclaimV2Coordinator]):
@@ -13,16 +31,119 @@ class ReclaimV2Entity(CoordinatorEntity[ReclaimV2Coordinator]):
 
     _attr_has_entity_name = True
 
-    def __init__(self, coordinator: ReclaimV2Coordinator) -> None:
+    def __init__(
+        self, coordinator: ReclaimV2Coordinator, description: EntityDescription
+    ) -> None:
         """Initialize the ReclaimV2 Entity."""
 
         super().__init__(coordinator=coordinator)
-        self._attr_unique_id = (
-            f"{coordinator.api.unique_id}_{self._attr_translation_key}"
-        )
+        self.entity_description = description
+        self._attr_unique_id = f"{coordinator.api.unique_id}_{description.key}"
 
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, coordinator.config_entry.data[CONF_UNIQUE_ID])},
             manufacturer="Reclaim Energy",
             model="Reclaim V2",
         )
+
+
+class ReclaimV2RegisterEntity(ReclaimV2Entity):
+    """Base entity which tracks a single register.
+
+    Writes are applied optimistically. The new state is confirmed by the
+    write ack (or a read returning the written value) and is rolled back if
+    neither arrives within WRITE_ACK_TIMEOUT seconds. A write skipped because
+    the register already holds the value is confirmed straight away, one
+    which could not be sent is rolled back straight away.
+    """
+
+    entity_description: ReclaimV2EntityDescription
+
+    # last value reported by the controller
+    _value: Any = None
+    # value written but not yet confirmed
+    _optimistic: Any = None
+    _cancel_rollback: CALLBACK_TYPE | None = None
+
+    def __init__(
+        self,
+        coordinator: ReclaimV2Coordinator,
+        description: ReclaimV2EntityDescription,
+    ) -> None:
+        """Initialize the entity and precompute the register accessor."""
+
+        super().__init__(coordinator, description)
+        self._register_name = description.register or description.key
+        self._address, self._decode, self._encode = ReclaimState.modbus_map[
+            self._register_name
+        ]
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        if not self.coordinator.last_update_success:
+            # no longer available
+            self.async_write_ha_state()
+            return
+
+        state = self.coordinator.data
+        raw = state.data.get(self._address)
+        if raw is None:
+            return
+
+        value = self._decode(raw) if self._decode else raw
+        if self._cancel_rollback is not None:
+            if not state.ack and value != self._optimistic:
+                # read taken before the write was applied
+                return
+            self._cancel_rollback()
+            self._cancel_rollback = None
+
+        self._value = value
+        self._update_value(value)
+
+    @abstractmethod
+    @callback
+    def _update_value(self, value: Any) -> None:
+        """Apply a decoded register value and write the state."""
+
+    async def _async_write_register(self, value: Any) -> None:
+        """Write a decoded value to the register."""
+        if self._cancel_rollback is not None:
+            self._cancel_rollback()
+        self._optimistic = value
+        self._cancel_rollback = async_call_later(
+            self.hass, WRITE_ACK_TIMEOUT, self._async_rollback
+        )
+        self._update_value(value)
+
+        if await self.coordinator.api.set_value(self._register_name, value):
+            return
+        if self._cancel_rollback is None or self._optimistic != value:
+            # already settled or superseded by a later write
+            return
+        self._cancel_rollback()
+        self._cancel_rollback = None
+        # unless the register already holds the value the write is lost
+        if value != self._value:
+            self._async_rollback(dt_util.utcnow())
+
+    @callback
+    def _async_rollback(self, _: datetime) -> None:
+        """Revert an unconfirmed write."""
+        self._cancel_rollback = None
+        self.hass.bus.async_fire(
+            EVENT_WRITE_ROLLBACK,
+            {
+                "entity_id": self.entity_id,
+                "register": self._register_name,
+                "value": self._optimistic,
+            },
+        )
+        self._update_value(self._value)
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Cancel a pending rollback."""
+        if self._cancel_rollback is not None:
+            self._cancel_rollback()
+            self._cancel_rollback = None
+        await super().async_will_remove_from_hass()
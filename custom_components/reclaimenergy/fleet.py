@@ -0,0 +1,129 @@
+"""Aggregates across all configured Reclaim units."""
+
+from collections.abc import Callable
+import logging
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import DOMAIN
+from .reclaimv2 import ReclaimState
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_FLEET = f"{DOMAIN}_fleet"
+
+
+@callback
+def async_get_fleet(hass: HomeAssistant) -> "FleetAggregate":
+    """Return the aggregate shared by all config entries."""
+    if DATA_FLEET not in hass.data:
+        hass.data[DATA_FLEET] = FleetAggregate()
+    return hass.data[DATA_FLEET]
+
+
+class FleetAggregate:
+    """Fleet totals maintained from the changes of each unit.
+
+    Every packet adjusts the totals by the difference to the unit's previous
+    values, so an update costs the same regardless of the number of units.
+    Units which are unavailable do not contribute.
+    """
+
+    def __init__(self) -> None:
+        """Initialise aggregate."""
+        # unique_id -> [power, running, water], None until known
+        self._units: dict[int, list] = {}
+        self.total_power = 0
+        self.running = 0
+        self._water_sum = 0.0
+        self._water_count = 0
+        self._listeners: list[Callable[[], None]] = []
+        # config entry owning the fleet sensors and how to create them in
+        # each loaded entry, in the order they were set up
+        self.owner: str | None = None
+        self._providers: dict[str, Callable[[], None]] = {}
+
+    @property
+    def units(self) -> int:
+        """Return the number of contributing units."""
+        return len(self._units)
+
+    @property
+    def average_water(self) -> float | None:
+        """Return the average water temperature."""
+        if not self._water_count:
+            return None
+        return self._water_sum / self._water_count
+
+    @callback
+    def async_add_listener(self, listener: Callable[[], None]) -> CALLBACK_TYPE:
+        """Call listener whenever the totals change."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    @callback
+    def async_add_provider(
+        self, entry_id: str, create: Callable[[], None]
+    ) -> CALLBACK_TYPE:
+        """Offer a config entry to provide the fleet sensors.
+
+        The first entry creates them. When the owner is removed, the sensors
+        are created again by the next entry still loaded.
+        """
+        self._providers[entry_id] = create
+        if self.owner is None:
+            self.owner = entry_id
+            create()
+        return lambda: self._async_remove_provider(entry_id)
+
+    @callback
+    def _async_remove_provider(self, entry_id: str) -> None:
+        self._providers.pop(entry_id, None)
+        if self.owner != entry_id:
+            return
+        self.owner = next(iter(self._providers), None)
+        if self.owner is not None:
+            _LOGGER.debug("Fleet sensors moved to entry %s", self.owner)
+            self._providers[self.owner]()
+
+    def _set(self, unit: list, power, running, water) -> bool:
+        """Replace the contribution of a unit, return True if it changed."""
+        old_power, old_running, old_water = unit
+        if (power, running, water) == (old_power, old_running, old_water):
+            return False
+
+        self.total_power += (power or 0) - (old_power or 0)
+        self.running += bool(running) - bool(old_running)
+        if old_water is not None:
+            self._water_sum -= old_water
+            self._water_count -= 1
+        if water is not None:
+            self._water_sum += water
+            self._water_count += 1
+        unit[:] = (power, running, water)
+        return True
+
+    def _notify(self) -> None:
+        for listener in list(self._listeners):
+            listener()
+
+    @callback
+    def async_update(self, unique_id: int, state: ReclaimState) -> None:
+        """Apply the power, pump and water registers of a packet."""
+        unit = self._units.setdefault(unique_id, [None, None, None])
+        values = list(unit)
+        for i, name in enumerate(("power", "pump", "water")):
+            try:
+                values[i] = getattr(state, name)
+            except AttributeError:
+                continue
+        if self._set(unit, *values):
+            self._notify()
+
+    @callback
+    def async_remove(self, unique_id: int) -> None:
+        """Drop the contribution of a unit."""
+        if (unit := self._units.pop(unique_id, None)) is None:
+            return
+        if self._set(unit, None, None, None):
+            self._notify()
@@ -0,0 +1,258 @@
+"""Compact long-term register history.
+
+Each packet is stored as a fixed-width record holding its timestamp, a bit
+mask of the registers it contained and the raw value of every register in
+ReclaimState.modbus_map. Records are appended in time order, so the file
+itself is the time index: a range is found by bisecting the memory-mapped
+timestamps and is then read sequentially.
+
+write(), scan() and prune() do blocking file I/O and must run in an executor.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Iterator, Sequence
+import logging
+import mmap
+import os
+from pathlib import Path
+import shutil
+import struct
+import threading
+from typing import Any
+
+from .reclaimv2 import ReclaimState
+
+_LOGGER = logging.getLogger(__name__)
+
+MAGIC = b"RCLH"
+VERSION = 1
+
+# magic, version, register count, then the register addresses
+HEADER = struct.Struct("<4sHH")
+ADDRESS = struct.Struct("<H")
+TIMESTAMP = struct.Struct("<d")
+
+# records buffered in memory before they are written to disk
+FLUSH_RECORDS = 64
+
+# bytes copied at a time when pruning rewrites the file
+PRUNE_CHUNK = 1 << 20
+
+
+def _layout(addresses: Sequence[int]) -> struct.Struct:
+    """Return the record layout: timestamp, presence mask and values."""
+    return struct.Struct(f"<dQ{len(addresses)}H")
+
+
+class _Timestamps(Sequence[float]):
+    """Timestamps of the records in a mapped file, for bisect."""
+
+    def __init__(self, buffer: mmap.mmap, offset: int, size: int, count: int):
+        self._buffer = buffer
+        self._offset = offset
+        self._size = size
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        (timestamp,) = TIMESTAMP.unpack_from(
+            self._buffer, self._offset + index * self._size
+        )
+        return timestamp
+
+
+class RegisterHistory:
+    """Append-only register history of one unit.
+
+    Packets are buffered by append() and take() on the event loop, write(),
+    scan() and prune() do the file I/O in an executor.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        """Initialise history stored at path."""
+        self.path = Path(path)
+        self.addresses = tuple(
+            sorted({register.address for register in ReclaimState.modbus_map.values()})
+        )
+        self._index = {address: i for i, address in enumerate(self.addresses)}
+        self._record = _layout(self.addresses)
+        self._header = HEADER.pack(MAGIC, VERSION, len(self.addresses)) + b"".join(
+            ADDRESS.pack(address) for address in self.addresses
+        )
+        self._pending: list[bytes] = []
+        self._last = 0.0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of records buffered in memory."""
+        return len(self._pending)
+
+    def append(self, timestamp: float, data: dict[int, int]) -> bool:
+        """Buffer a packet, return True once a flush is due.
+
+        Timestamps are kept non-decreasing so the file stays sorted.
+        """
+        timestamp = max(timestamp, self._last)
+        self._last = timestamp
+        mask = 0
+        values = [0] * len(self.addresses)
+        for address, value in data.items():
+            if (i := self._index.get(address)) is not None:
+                mask |= 1 << i
+                values[i] = value & 0xFFFF
+        self._pending.append(self._record.pack(timestamp, mask, *values))
+        return len(self._pending) >= FLUSH_RECORDS
+
+    def take(self) -> bytes:
+        """Return and clear the buffered records."""
+        records, self._pending = b"".join(self._pending), []
+        return records
+
+    def write(self, records: bytes) -> None:
+        """Append records returned by take() to the file."""
+        if not records:
+            return
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if self._read_header() != self.addresses:
+                self._start_file()
+            with self.path.open("ab") as file:
+                file.write(records)
+
+    def _read_header(self) -> tuple[int, ...] | None:
+        """Return the register addresses of the file, None if not usable."""
+        try:
+            with self.path.open("rb") as file:
+                magic, version, count = HEADER.unpack(file.read(HEADER.size))
+                raw = file.read(count * ADDRESS.size)
+        except (FileNotFoundError, struct.error):
+            return None
+        if magic != MAGIC or version != VERSION or len(raw) != count * ADDRESS.size:
+            return None
+        return tuple(address for (address,) in ADDRESS.iter_unpack(raw))
+
+    def _start_file(self) -> None:
+        """Start a new file, keeping an incompatible one aside."""
+        if self.path.exists():
+            old = self.path.with_suffix(self.path.suffix + ".old")
+            _LOGGER.warning(
+                "Register layout of %s changed, moved to %s", self.path, old
+            )
+            os.replace(self.path, old)
+        with self.path.open("wb") as file:
+            file.write(self._header)
+
+    def scan(
+        self, start: float | None = None, end: float | None = None
+    ) -> Iterator[tuple[float, dict[int, int]]]:
+        """Yield (timestamp, registers) of the records in [start, end).
+
+        Only records already flushed are returned.
+        """
+        if (addresses := self._read_header()) is None:
+            return
+        record = _layout(addresses)
+        offset = HEADER.size + len(addresses) * ADDRESS.size
+
+        with self.path.open("rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            count = (size - offset) // record.size
+            if count <= 0:
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                timestamps = _Timestamps(buffer, offset, record.size, count)
+                first = 0 if start is None else bisect_left(timestamps, start)
+                last = count if end is None else bisect_left(timestamps, end)
+                for i in range(first, last):
+                    timestamp, mask, *values = record.unpack_from(
+                        buffer, offset + i * record.size
+                    )
+                    yield (
+                        timestamp,
+                        {
+                            address: values[bit]
+                            for bit, address in enumerate(addresses)
+                            if mask >> bit & 1
+                        },
+                    )
+
+    def downsample(
+        self,
+        start: float,
+        end: float,
+        interval: float,
+        names: Sequence[str],
+    ) -> list[dict[str, Any]]:
+        """Return per interval averages of the named registers.
+
+        Numeric registers are averaged over each interval, other registers
+        report the last value seen. Intervals without data are omitted.
+        """
+        registers = {name: ReclaimState.modbus_map[name] for name in names}
+        buckets: list[dict[str, Any]] = []
+        bucket: int | None = None
+        sums: dict[str, list] = {}
+
+        def close() -> None:
+            row: dict[str, Any] = {"start": start + bucket * interval}
+            for name, (total, count, last) in sums.items():
+                row[name] = total / count if count else last
+            buckets.append(row)
+
+        for timestamp, data in self.scan(start, end):
+            index = int((timestamp - start) // interval)
+            if index != bucket:
+                if sums:
+                    close()
+                bucket, sums = index, {}
+            for name, (address, decode, _) in registers.items():
+                if (raw := data.get(address)) is None:
+                    continue
+                value = decode(raw) if decode else raw
+                total, count, _ = sums.get(name, (0, 0, None))
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    sums[name] = [total + value, count + 1, value]
+                else:
+                    sums[name] = [total, count, value]
+        if sums:
+            close()
+        return buckets
+
+    def prune(self, before: float) -> int:
+        """Drop records older than before, return the number dropped."""
+        with self._lock:
+            return self._prune(before)
+
+    def _prune(self, before: float) -> int:
+        if self._read_header() != self.addresses:
+            return 0
+        offset = len(self._header)
+        with self.path.open("rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            count = (size - offset) // self._record.size
+            if count <= 0:
+                return 0
+            # nothing to drop while the oldest record is still kept
+            file.seek(offset)
+            (oldest,) = TIMESTAMP.unpack(file.read(TIMESTAMP.size))
+            if oldest >= before:
+                return 0
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                timestamps = _Timestamps(buffer, offset, self._record.size, count)
+                first = bisect_left(timestamps, before)
+
+            temporary = self.path.with_suffix(self.path.suffix + ".new")
+            file.seek(offset + first * self._record.size)
+            try:
+                with temporary.open("wb") as new:
+                    new.write(self._header)
+                    shutil.copyfileobj(file, new, PRUNE_CHUNK)
+                os.replace(temporary, self.path)
+            except OSError:
+                temporary.unlink(missing_ok=True)
+                raise
+        return first
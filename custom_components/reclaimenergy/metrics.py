@@ -0,0 +1,121 @@
+"""Lightweight counters and latency histograms for the MQTT pipeline."""
+
+from bisect import bisect_left
+import time
+from typing import Any
+
+
+class LatencyHistogram:
+    """Fixed bucket histogram of durations in seconds."""
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        """Initialise with the upper bounds of each bucket."""
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last: float | None = None
+
+    def record(self, value: float) -> None:
+        """Record a duration."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.last = value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean duration."""
+        return self.total / self.count if self.count else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a summary suitable for diagnostics."""
+        labels = [f"<={b}" for b in self.buckets] + [f">{self.buckets[-1]}"]
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "max": self.max,
+            "last": self.last,
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class RateCounter:
+    """Count events per minute using fixed one minute windows."""
+
+    def __init__(self) -> None:
+        """Initialise counter."""
+        self.total = 0
+        self._window = 0
+        self._current = 0
+        self.last_minute = 0
+
+    def hit(self, now: float) -> None:
+        """Record an event at monotonic time now."""
+        window = int(now // 60)
+        if window != self._window:
+            self.last_minute = self._current if window == self._window + 1 else 0
+            self._window = window
+            self._current = 0
+        self._current += 1
+        self.total += 1
+
+    def per_minute(self, now: float) -> int:
+        """Return the number of events in the last complete minute."""
+        window = int(now // 60)
+        if window == self._window:
+            return self.last_minute
+        if window == self._window + 1:
+            return self._current
+        return 0
+
+
+class PipelineMetrics:
+    """Counters for one ReclaimV2 unit."""
+
+    def __init__(self) -> None:
+        """Initialise counters."""
+        self.messages = RateCounter()
+        self.full_reads = 0
+        self.partial_reads = 0
+        self.write_acks = 0
+        self.decode_errors = 0
+        self.unknown_payloads = 0
+        self.publish_errors = 0
+        self.connects = 0
+        self.mqtt_errors = 0
+        self.queue_coalesced = 0
+        self.queue_dropped = 0
+        self.queue_high_water = 0
+        self.polls_superseded = 0
+        self.writes_suppressed = 0
+        # request_update() -> full read packet
+        self.update_latency = LatencyHistogram((0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0))
+        # time spent in the listener (entity updates)
+        self.dispatch_time = LatencyHistogram((0.0005, 0.001, 0.005, 0.01, 0.05, 0.1))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return all counters suitable for diagnostics."""
+        now = time.monotonic()
+        return {
+            "messages": self.messages.total,
+            "messages_per_minute": self.messages.per_minute(now),
+            "full_reads": self.full_reads,
+            "partial_reads": self.partial_reads,
+            "write_acks": self.write_acks,
+            "decode_errors": self.decode_errors,
+            "unknown_payloads": self.unknown_payloads,
+            "publish_errors": self.publish_errors,
+            "connects": self.connects,
+            "mqtt_errors": self.mqtt_errors,
+            "queue_coalesced": self.queue_coalesced,
+            "queue_dropped": self.queue_dropped,
+            "queue_high_water": self.queue_high_water,
+            "polls_superseded": self.polls_superseded,
+            "writes_suppressed": self.writes_suppressed,
+            "update_latency": self.update_latency.as_dict(),
+            "dispatch_time": self.dispatch_time.as_dict(),
+        }
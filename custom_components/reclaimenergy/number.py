@@ -1,120 +1,89 @@
 """Timer settings for Heat Pump."""
 
+from dataclasses import dataclass
 import logging
+from typing import Any
 
-from homeassistant.components.number import NumberDeviceClass, NumberEntity
+from homeassistant.components.number import (
+    NumberDeviceClass,
+    NumberEntity,
+    NumberEntityDescription,
+)
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import UnitOfTemperature
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .entity import ReclaimV2Entity
+from .entity import ReclaimV2EntityDescription, ReclaimV2RegisterEntity
 
 _LOGGER = logging.getLogger(__name__)
 
 
-async def async_setup_entry(
-    hass: HomeAssistant,
-    entry: ConfigEntry,
-    async_add_entities: AddEntitiesCallback,
-) -> None:
-    """Set up the binary_sensor platform."""
-    async_add_entities(
-        [
-            Mode5Timer1Duration(coordinator=entry.runtime_data),
-            Mode5Timer2Duration(coordinator=entry.runtime_data),
-            Mode5Timer2OnTemp(coordinator=entry.runtime_data),
-            Mode6Timer1Duration(coordinator=entry.runtime_data),
-            Mode6Timer2Duration(coordinator=entry.runtime_data),
-            Mode6Timer2OnTemp(coordinator=entry.runtime_data),
-            Mode6Timer2OffTemp(coordinator=entry.runtime_data),
-            Mode7Duration(coordinator=entry.runtime_data),
-        ]
-    )
-
-
-class ReclaimV2DurationBase(ReclaimV2Entity, NumberEntity):
-    """Represents the timer parameters of the heat pump."""
-
-    _attr_entity_registry_enabled_default = False
-    _attr_native_max_value = 12
-    _attr_native_min_value = 3
-    _attr_native_step = 1
-    _attr_native_value = 0
-
-    @callback
-    def _handle_coordinator_update(self) -> None:
-        if hasattr(self.coordinator.data, self._attr_translation_key):
-            self._attr_native_value = getattr(
-                self.coordinator.data, self._attr_translation_key
-            )
-            self.async_write_ha_state()
-
-    async def async_set_native_value(self, value: float) -> None:
-        """Set timer duration."""
-        await self.coordinator.api.set_value(self._attr_translation_key, int(value))
+@dataclass(frozen=True, kw_only=True)
+class ReclaimV2NumberEntityDescription(
+    NumberEntityDescription, ReclaimV2EntityDescription
+):
+    """Describes a writable numeric register."""
 
+    entity_registry_enabled_default: bool = False
+    native_max_value: float = 12
+    native_min_value: float = 3
+    native_step: float = 1
 
-class Mode5Timer1Duration(ReclaimV2DurationBase):
-    """Represents the timer parameters of the heat pump."""
 
-    _attr_translation_key = "mode5_timer1_duration"
+def _duration(key: str, **kwargs: Any) -> ReclaimV2NumberEntityDescription:
+    return ReclaimV2NumberEntityDescription(key=key, translation_key=key, **kwargs)
 
 
-class Mode5Timer2Duration(ReclaimV2DurationBase):
-    """Represents the timer parameters of the heat pump."""
-
-    _attr_translation_key = "mode5_timer2_duration"
-    _attr_native_min_value = 0
-
-
-class Mode5Timer2OnTemp(ReclaimV2DurationBase):
-    """Represents the timer parameters of the heat pump."""
-
-    _attr_device_class = NumberDeviceClass.TEMPERATURE
-    _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
-    _attr_translation_key = "mode5_timer2_on_temp"
-    _attr_native_max_value = 45
-    _attr_native_min_value = 25
-    _attr_native_step = 0.5
-
-
-class Mode6Timer1Duration(ReclaimV2DurationBase):
-    """Represents the timer parameters of the heat pump."""
-
-    _attr_translation_key = "mode6_timer1_duration"
-
+def _temperature(
+    key: str, min_value: float, max_value: float
+) -> ReclaimV2NumberEntityDescription:
+    return ReclaimV2NumberEntityDescription(
+        key=key,
+        translation_key=key,
+        device_class=NumberDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        native_max_value=max_value,
+        native_min_value=min_value,
+        native_step=0.5,
+    )
 
-class Mode6Timer2Duration(ReclaimV2DurationBase):
-    """Represents the timer parameters of the heat pump."""
 
-    _attr_translation_key = "mode6_timer2_duration"
-    _attr_native_min_value = 0
+NUMBERS: tuple[ReclaimV2NumberEntityDescription, ...] = (
+    _duration("mode5_timer1_duration"),
+    _duration("mode5_timer2_duration", native_min_value=0),
+    _temperature("mode5_timer2_on_temp", 25, 45),
+    _duration("mode6_timer1_duration"),
+    _duration("mode6_timer2_duration", native_min_value=0),
+    _temperature("mode6_timer2_on_temp", 25, 45),
+    _temperature("mode6_timer2_off_temp", 55, 60),
+    _duration("mode7_duration"),
+)
 
 
-class Mode6Timer2OnTemp(ReclaimV2DurationBase):
-    """Represents the timer parameters of the heat pump."""
-
-    _attr_device_class = NumberDeviceClass.TEMPERATURE
-    _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
-    _attr_translation_key = "mode6_timer2_on_temp"
-    _attr_native_max_value = 45
-    _attr_native_min_value = 25
-    _attr_native_step = 0.5
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the number platform."""
+    async_add_entities(
+        ReclaimV2Number(entry.runtime_data, description) for description in NUMBERS
+    )
 
 
-class Mode6Timer2OffTemp(ReclaimV2DurationBase):
+class ReclaimV2Number(ReclaimV2RegisterEntity, NumberEntity):
     """Represents the timer parameters of the heat pump."""
 
-    _attr_device_class = NumberDeviceClass.TEMPERATURE
-    _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
-    _attr_translation_key = "mode6_timer2_off_temp"
-    _attr_native_max_value = 60
-    _attr_native_min_value = 55
-    _attr_native_step = 0.5
+    entity_description: ReclaimV2NumberEntityDescription
 
+    _attr_native_value = 0
 
-class Mode7Duration(ReclaimV2DurationBase):
-    """Represents the timer parameters of the heat pump."""
+    @callback
+    def _update_value(self, value: Any) -> None:
+        self._attr_native_value = value
+        self.async_write_ha_state()
 
-    _attr_translation_key = "mode7_duration"
+    async def async_set_native_value(self, value: float) -> None:
+        """Set timer parameter."""
+        await self._async_write_register(value)
@@ -0,0 +1,154 @@
+"""Program heating timers from tariff and solar forecast entities."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import logging
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.util import dt as dt_util
+
+from .coordinator import ReclaimV2Coordinator
+from .planner import HORIZON, HeatingPlan, HeatingPlanner, hourly_costs
+
+_LOGGER = logging.getLogger(__name__)
+
+# kW assumed until the power draw has been learned
+DEFAULT_POWER = 1.0
+
+# timer (min, max) durations of each mode and the registers they program
+MODE_TIMERS: dict[int, tuple[tuple[tuple[int, int], str], ...]] = {
+    5: (((3, 12), "mode5_timer1"), ((0, 12), "mode5_timer2")),
+    7: (((3, 12), "mode7"),),
+}
+
+
+@dataclass
+class OptimizerConfig:
+    """Where the optimizer reads its inputs and what it programs."""
+
+    mode: int
+    price_entity: str
+    price_attribute: str
+    pv_entity: str | None
+    pv_attribute: str
+    feed_in: float
+    target: float
+    hours: int | None
+    apply: bool
+
+
+def hourly_series(values: Any, hour: int) -> list[float]:
+    """Return HORIZON hourly values starting at hour.
+
+    values holds hourly values starting at midnight today, today's values
+    are repeated if tomorrow's are not available yet.
+    """
+    if not isinstance(values, (list, tuple)) or len(values) < 24:
+        raise ServiceValidationError("Forecast must list at least 24 hourly values")
+    values = [float(value) for value in values]
+    series = values[hour : hour + HORIZON]
+    while len(series) < HORIZON:
+        series.append(values[(hour + len(series)) % 24])
+    return series
+
+
+class HeatingOptimizer:
+    """Plan heating windows for a unit and program them into its timers."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: ReclaimV2Coordinator,
+        config: OptimizerConfig,
+    ) -> None:
+        """Initialise optimizer."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self.config = config
+        self.planner = HeatingPlanner(
+            *(limits for limits, _ in MODE_TIMERS[config.mode])
+        )
+        self.plan: HeatingPlan | None = None
+        self._unsub: CALLBACK_TYPE | None = None
+
+    def _attribute(self, entity_id: str, attribute: str) -> Any:
+        if (state := self.hass.states.get(entity_id)) is None:
+            raise ServiceValidationError(f"Unknown entity {entity_id}")
+        return state.attributes.get(attribute)
+
+    def _hours_needed(self) -> int:
+        if self.config.hours is not None:
+            return self.config.hours
+        # data is often a partial read or an ack without the water register
+        water = self.coordinator.water
+        hours = None
+        if water is not None:
+            hours = self.coordinator.heating.hours_needed(water, self.config.target)
+        if hours is None:
+            raise ServiceValidationError(
+                "Heating rate not learned yet, the number of hours is required"
+            )
+        return hours
+
+    def compute(self) -> HeatingPlan:
+        """Plan from the current forecasts."""
+        hour = dt_util.now().hour
+        config = self.config
+        prices = hourly_series(
+            self._attribute(config.price_entity, config.price_attribute), hour
+        )
+        pv = None
+        if config.pv_entity:
+            pv = hourly_series(
+                self._attribute(config.pv_entity, config.pv_attribute), hour
+            )
+
+        power = self.coordinator.heating.power or DEFAULT_POWER
+        costs = hourly_costs(prices, pv, power, config.feed_in)
+        return self.planner.plan(costs, self._hours_needed(), hour)
+
+    def registers(self, plan: HeatingPlan) -> dict[str, int]:
+        """Return the timer registers programming the plan."""
+        registers = {}
+        for window, (_, prefix) in zip(plan.windows, MODE_TIMERS[self.config.mode]):
+            registers[f"{prefix}_start"] = window.start
+            registers[f"{prefix}_duration"] = window.duration
+        return registers
+
+    async def async_update(self) -> HeatingPlan:
+        """Re-plan and program the timers if the plan changed."""
+        plan = self.compute()
+        if plan != self.plan:
+            _LOGGER.debug("New heating plan: %s", plan)
+            self.plan = plan
+            if self.config.apply:
+                await self.coordinator.api.set_values(self.registers(plan))
+        return plan
+
+    @callback
+    def async_track(self) -> None:
+        """Re-plan whenever the forecast entities change."""
+        entities = [self.config.price_entity]
+        if self.config.pv_entity:
+            entities.append(self.config.pv_entity)
+
+        async def _async_forecast_changed(event: Event) -> None:
+            try:
+                await self.async_update()
+            except ServiceValidationError as e:
+                _LOGGER.warning("Unable to plan heating: %s", e)
+
+        self._unsub = async_track_state_change_event(
+            self.hass, entities, _async_forecast_changed
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop tracking the forecast entities."""
+        if self._unsub:
+            self._unsub()
+            self._unsub = None
@@ -0,0 +1,56 @@
+"""Fast decoding of controller MQTT payloads.
+
+orjson is used when it is installed (it ships with Home Assistant) and the
+standard library otherwise. Both parse the payload bytes directly and raise
+json.JSONDecodeError (or a subclass) on invalid input.
+"""
+
+from collections.abc import Collection, Sequence
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+loads = orjson.loads if orjson is not None else json.loads
+
+
+def registers(
+    values: list[int], wanted: Collection[int] | None = None
+) -> dict[int, int]:
+    """Return {address: value} of a flat [address, value, ...] list.
+
+    Registers not in wanted are skipped, None keeps all of them. Raises
+    ValueError if the list does not hold whole pairs.
+    """
+    if len(values) % 2:
+        raise ValueError(f"Odd number of values in register pairs: {len(values)}")
+    pairs = iter(values)
+    if wanted is None:
+        return dict(zip(pairs, pairs))
+    return {address: value for address, value in zip(pairs, pairs) if address in wanted}
+
+
+def consecutive(start: int, values: list[int]) -> dict[int, int]:
+    """Return {address: value} of values read from consecutive registers."""
+    return dict(enumerate(values, start))
+
+
+class Layout:
+    """Positions of the wanted registers in full reads of a known layout."""
+
+    __slots__ = ("addresses", "positions")
+
+    def __init__(self, addresses: Sequence[int], wanted: Collection[int]) -> None:
+        """Initialise from the register addresses in the order they are sent."""
+        self.addresses = list(addresses)
+        self.positions = tuple(
+            2 * i for i, address in enumerate(self.addresses) if address in wanted
+        )
+
+    def registers(self, values: list[int]) -> dict[int, int] | None:
+        """Return the wanted registers, None if values has another layout."""
+        if len(values) != 2 * len(self.addresses) or values[::2] != self.addresses:
+            return None
+        return {values[i]: values[i + 1] for i in self.positions}
@@ -0,0 +1,207 @@
+"""Tariff and solar aware heating window planner.
+
+Plans whole hour heating windows over the next 24 hours. The cost of running
+the heat pump in each hour is the grid import at that hour's price, plus the
+feed-in revenue forgone for any solar power it uses.
+"""
+
+from dataclasses import dataclass
+import math
+
+HORIZON = 24
+
+
+@dataclass(frozen=True)
+class HeatingWindow:
+    """A heating window, start is the hour of day."""
+
+    start: int
+    duration: int
+
+
+@dataclass(frozen=True)
+class HeatingPlan:
+    """The cheapest windows found and their cost."""
+
+    windows: tuple[HeatingWindow, ...]
+    cost: float
+    # False if the windows are shorter than the hours needed
+    satisfied: bool
+
+
+def hourly_costs(
+    prices: list[float],
+    pv: list[float] | None,
+    power: float,
+    feed_in: float = 0.0,
+) -> list[float]:
+    """Return the cost of running for each hour of the horizon.
+
+    Prices are per kWh, pv and power are in kW.
+    """
+    costs = []
+    for hour in range(HORIZON):
+        solar = min(power, pv[hour]) if pv else 0.0
+        costs.append((power - solar) * prices[hour] + solar * feed_in)
+    return costs
+
+
+class HeatingRateEstimator:
+    """Learn the tank heating rate and power draw while the pump runs."""
+
+    def __init__(self, smoothing: float = 0.2) -> None:
+        """Initialise estimator."""
+        self.smoothing = smoothing
+        # degrees per hour
+        self.rate: float | None = None
+        # kW
+        self.power: float | None = None
+        self._last: tuple[float, float] | None = None
+
+    def _smooth(self, current: float | None, sample: float) -> float:
+        if current is None:
+            return sample
+        return current + self.smoothing * (sample - current)
+
+    def update(self, now: float, water: float, power: float, running: bool) -> None:
+        """Add a sample, now is in seconds, water in degrees, power in W."""
+        if not running:
+            self._last = None
+            return
+
+        if power > 0:
+            self.power = self._smooth(self.power, power / 1000)
+
+        if self._last is None:
+            self._last = (now, water)
+            return
+
+        elapsed = now - self._last[0]
+        if elapsed < 600:
+            return
+        if water > self._last[1]:
+            self.rate = self._smooth(
+                self.rate, (water - self._last[1]) * 3600 / elapsed
+            )
+        self._last = (now, water)
+
+    def hours_needed(self, water: float, target: float) -> int | None:
+        """Return the whole hours needed to heat from water to target."""
+        if self.rate is None:
+            return None
+        return max(0, math.ceil((target - water) / self.rate))
+
+
+class HeatingPlanner:
+    """Find the cheapest one or two heating windows.
+
+    Windows are placed within the horizon starting at the current hour and
+    may not overlap. The search is a dynamic program over prefix sums of the
+    hourly costs, best[e][d] holding the cheapest window of d hours ending
+    at or before hour e, so planning takes O(HORIZON * max_duration^2).
+    The last plan is cached and returned while the inputs are unchanged.
+    """
+
+    def __init__(
+        self,
+        first: tuple[int, int] = (3, 12),
+        second: tuple[int, int] | None = None,
+    ) -> None:
+        """Initialise with the (min, max) duration of each timer."""
+        self.first = first
+        self.second = second
+        self._cached: tuple[tuple, HeatingPlan] | None = None
+
+    def plan(self, costs: list[float], hours: int, start_hour: int) -> HeatingPlan:
+        """Return the cheapest plan providing at least hours of heating."""
+        key = (tuple(costs), hours, start_hour)
+        if self._cached and self._cached[0] == key:
+            return self._cached[1]
+
+        prefix = [0.0]
+        for cost in costs[:HORIZON]:
+            prefix.append(prefix[-1] + cost)
+
+        if self.second is None:
+            result = self._plan_single(prefix, hours)
+        else:
+            result = min(
+                self._plan_pair(prefix, hours, self.first, self.second),
+                self._plan_pair(prefix, hours, self.second, self.first, swap=True),
+                key=lambda plan: plan[0],
+            )
+
+        cost, windows = result
+        maximum = self.first[1] + (self.second[1] if self.second else 0)
+        plan = HeatingPlan(
+            windows=tuple(
+                HeatingWindow((start_hour + start) % 24, duration)
+                for start, duration in windows
+            ),
+            cost=cost,
+            satisfied=hours <= maximum,
+        )
+        self._cached = (key, plan)
+        return plan
+
+    def _plan_single(self, prefix: list[float], hours: int) -> tuple[float, list]:
+        low, high = self.first
+        best = (math.inf, [])
+        for duration in range(min(max(low, hours), high), high + 1):
+            for start in range(HORIZON - duration + 1):
+                cost = prefix[start + duration] - prefix[start]
+                if cost < best[0]:
+                    best = (cost, [(start, duration)])
+        return best
+
+    def _plan_pair(
+        self,
+        prefix: list[float],
+        hours: int,
+        first: tuple[int, int],
+        second: tuple[int, int],
+        swap: bool = False,
+    ) -> tuple[float, list]:
+        """Plan a window from first followed by a later one from second."""
+        low1, high1 = first
+        low2, high2 = second
+        hours = min(hours, high1 + high2)
+        inf = math.inf
+
+        # best[e][d] = (cost, start) of the cheapest d hour window ending <= e
+        best = [[(inf, 0)] * (high1 + 1) for _ in range(HORIZON + 1)]
+        for end in range(1, HORIZON + 1):
+            row, previous = best[end], best[end - 1]
+            for duration in range(low1, min(high1, end) + 1):
+                start = end - duration
+                cost = prefix[end] - prefix[start]
+                row[duration] = min(previous[duration], (cost, start))
+
+        # suffix[e][k] = (cost, start, d) cheapest first window with d >= k
+        suffix = []
+        for end in range(HORIZON + 1):
+            row = [(inf, 0, 0)] * (high1 + 2)
+            for duration in range(high1, -1, -1):
+                row[duration] = row[duration + 1]
+                cost, start = best[end][duration]
+                if duration >= low1 and cost < row[duration][0]:
+                    row[duration] = (cost, start, duration)
+            suffix.append(row)
+
+        result = (inf, [])
+        for duration2 in range(low2, high2 + 1):
+            need = max(low1, hours - duration2)
+            if need > high1:
+                continue
+            # a zero length second window is placed at the end of the horizon
+            if duration2:
+                starts = range(HORIZON - duration2 + 1)
+            else:
+                starts = range(HORIZON, HORIZON + 1)
+            for start2 in starts:
+                cost1, start1, duration1 = suffix[start2][need]
+                cost = cost1 + prefix[start2 + duration2] - prefix[start2]
+                if cost < result[0]:
+                    windows = [(start1, duration1), (start2, duration2)]
+                    result = (cost, windows[::-1] if swap else windows)
+        return result
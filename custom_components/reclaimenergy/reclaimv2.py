@@ -1,20 +1,45 @@
 """Reclaim Energy V2 Heat Pump Hot Water System Controller."""
 
 import asyncio
+from collections import deque
+from collections.abc import Callable
+import contextlib
 import json
 import logging
+import os
 import ssl
-from typing import Any
+import threading
+import time
+from typing import Any, NamedTuple
 
 import aiomqtt
 import boto3
 import botocore
 
+from . import payload as codec
+from .metrics import PipelineMetrics
+
 AWS_REGION_NAME = "ap-southeast-2"
 AWS_IDENTITY_POOL = "ap-southeast-2:e04c5d62-0c40-4eac-a343-27d5f76c4920"
 AWS_HOSTNAME = "a254daig9zo2wn-ats.iot.ap-southeast-2.amazonaws.com"
 AWS_PORT = 8883
 
+# register blocks (start, count) needed while the heat pump is running:
+# water temperature and one block from the pump state to the current
+FAST_POLL_BLOCKS = ((79, 1), (200, 27))
+
+# maximum number of decoded messages waiting to be processed by the listener
+MESSAGE_QUEUE_SIZE = 32
+
+# seconds to wait for a write to be acknowledged before giving up on it
+WRITE_ACK_TIMEOUT = 30
+
+# writes of the value a register was confirmed to hold within this many
+# seconds are skipped, two slow polls
+CONFIRMED_VALUE_MAX_AGE = 600
+
+RECONNECT_DELAY = 5
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -86,9 +111,55 @@ def ushort(x: int):
     return x - 65536 if x & 0x8000 else x
 
 
+def _hour(x: int) -> int:
+    """Decode an hour stored in the high byte of a register."""
+    return int(x / 256)
+
+
+def _to_hour(x: Any) -> int:
+    """Encode an hour into the high byte of a register."""
+    return int(x) * 256
+
+
+def _half(x: int) -> float:
+    """Decode a value stored in half units."""
+    return x / 2
+
+
+def _to_half(x: Any) -> int:
+    """Encode a value into half units."""
+    return int(x * 2)
+
+
+class PublishPolicy(NamedTuple):
+    """How a class of command is published."""
+
+    qos: int
+    # seconds an unanswered request makes an identical new one redundant
+    supersede: float = 0
+
+
+# polls are idempotent and a lost one is replaced by the next poll, so they
+# are not worth a PUBACK round trip or redelivery after a reconnect
+PUBLISH_POLICIES = {
+    "poll": PublishPolicy(qos=0, supersede=10),
+    "write": PublishPolicy(qos=1),
+}
+
+
+class Register(NamedTuple):
+    """A modbus register and its codec."""
+
+    address: int
+    decode: Callable[[int], Any] | None
+    encode: Callable[[Any], int] | None
+
+
 class ReclaimState:
     """Represents the current system state."""
 
+    __slots__ = ("data", "full", "ack")
+
     modes = [
         "Mode 1: 24H",
         "Mode 2: Off-Peak 1",
@@ -103,61 +174,63 @@ class ReclaimState:
     days = ["Sun", "Mon", "Tue", "Wed", "Thurs", "Fri", "Sat"]
 
     modbus_map = {
-        "mode": (
+        "mode": Register(
             40964,
             lambda x: ReclaimState.modes[x - 2],
             lambda x: ReclaimState.modes.index(x) + 2,
         ),
-        "pump": (200, None, None),
-        "case": (50, lambda x: ushort(x) / 2, None),
-        "water": (79, lambda x: ushort(x) / 2, None),
-        "outlet": (213, ushort, None),
-        "inlet": (214, ushort, None),
-        "discharge": (215, ushort, None),
-        "suction": (216, ushort, None),
-        "evaporator": (217, ushort, None),
-        "ambient": (218, ushort, None),
-        "compspeed": (219, None, None),
-        "waterspeed": (220, None, None),
-        "fanspeed": (221, None, None),
-        "power": (225, None, None),
-        "current": (226, lambda x: x / 1000, None),
-        "hours": (222, None, None),
-        "starts": (223, None, None),
-        "boost": (40990, bool, int),
-        "mode5_timer1_start": (40971, lambda x: int(x / 256), lambda x: x * 256),
-        "mode5_timer1_duration": (40972, lambda x: int(x / 256), lambda x: x * 256),
-        "mode5_timer2_start": (40973, lambda x: int(x / 256), lambda x: x * 256),
-        "mode5_timer2_duration": (40974, lambda x: int(x / 256), lambda x: x * 256),
-        "mode5_timer2_on_temp": (40975, lambda x: x / 2, lambda x: x * 2),
-        "mode6_timer1_start": (40976, lambda x: int(x / 256), lambda x: x * 256),
-        "mode6_timer1_duration": (40977, lambda x: int(x / 256), lambda x: x * 256),
-        "mode6_timer2_start": (40991, lambda x: int(x / 256), lambda x: x * 256),
-        "mode6_timer2_duration": (40992, lambda x: int(x / 256), lambda x: x * 256),
-        "mode6_timer2_on_temp": (40978, lambda x: x / 2, lambda x: x * 2),
-        "mode6_timer2_off_temp": (40979, lambda x: x / 2, lambda x: x * 2),
-        "mode7_start": (40980, lambda x: int(x / 256), lambda x: x * 256),
-        "mode7_duration": (40981, lambda x: int(x / 256), lambda x: x * 256),
-        "mode8_day": (
+        "pump": Register(200, None, None),
+        "case": Register(50, lambda x: ushort(x) / 2, None),
+        "water": Register(79, lambda x: ushort(x) / 2, None),
+        "outlet": Register(213, ushort, None),
+        "inlet": Register(214, ushort, None),
+        "discharge": Register(215, ushort, None),
+        "suction": Register(216, ushort, None),
+        "evaporator": Register(217, ushort, None),
+        "ambient": Register(218, ushort, None),
+        "compspeed": Register(219, None, None),
+        "waterspeed": Register(220, None, None),
+        "fanspeed": Register(221, None, None),
+        "power": Register(225, None, None),
+        "current": Register(226, lambda x: x / 1000, None),
+        "hours": Register(222, None, None),
+        "starts": Register(223, None, None),
+        "boost": Register(40990, bool, int),
+        "mode5_timer1_start": Register(40971, _hour, _to_hour),
+        "mode5_timer1_duration": Register(40972, _hour, _to_hour),
+        "mode5_timer2_start": Register(40973, _hour, _to_hour),
+        "mode5_timer2_duration": Register(40974, _hour, _to_hour),
+        "mode5_timer2_on_temp": Register(40975, _half, _to_half),
+        "mode6_timer1_start": Register(40976, _hour, _to_hour),
+        "mode6_timer1_duration": Register(40977, _hour, _to_hour),
+        "mode6_timer2_start": Register(40991, _hour, _to_hour),
+        "mode6_timer2_duration": Register(40992, _hour, _to_hour),
+        "mode6_timer2_on_temp": Register(40978, _half, _to_half),
+        "mode6_timer2_off_temp": Register(40979, _half, _to_half),
+        "mode7_start": Register(40980, _hour, _to_hour),
+        "mode7_duration": Register(40981, _hour, _to_hour),
+        "mode8_day": Register(
             41000,
             lambda x: ReclaimState.days[x - 1],
             lambda x: ReclaimState.days.index(x) + 1,
         ),
-        "mode8_start": (41001, lambda x: int(x / 256), lambda x: x * 256),
+        "mode8_start": Register(41001, _hour, _to_hour),
     }
 
-    def __init__(self, data: dict) -> None:
+    def __init__(self, data: dict, full: bool = False, ack: bool = False) -> None:
         """Initialise with modbus data."""
         self.data = data
+        self.full = full
+        self.ack = ack
 
     def __getattr__(self, name: str):
         """Return a processed attribute."""
         try:
             mb = self.modbus_map[name]
-            if mb[1]:
-                return mb[1](self.data[mb[0]])
+            if mb.decode:
+                return mb.decode(self.data[mb.address])
 
-            return self.data[mb[0]]
+            return self.data[mb.address]
         except (IndexError, KeyError) as e:
             raise AttributeError from e
 
@@ -169,19 +242,179 @@ class MessageListener:
         """Process device state updates."""
 
 
+class MessageQueue:
+    """Bounded hand-off queue between the MQTT reader and the listener.
+
+    Consecutive full read packets are coalesced so only the newest one is
+    delivered, write acks are always preserved.
+    """
+
+    def __init__(self, metrics: PipelineMetrics, maxsize: int = MESSAGE_QUEUE_SIZE):
+        """Initialise queue."""
+        self.metrics = metrics
+        self.maxsize = maxsize
+        self._items: deque[ReclaimState] = deque()
+        self._ready = asyncio.Event()
+
+    def __len__(self) -> int:
+        """Return the number of queued messages."""
+        return len(self._items)
+
+    def put(self, state: ReclaimState) -> None:
+        """Queue a message without blocking."""
+        if state.full and self._items and self._items[-1].full:
+            self._items[-1] = state
+            self.metrics.queue_coalesced += 1
+            return
+
+        if len(self._items) >= self.maxsize and (victim := self._victim()) is not None:
+            del self._items[victim]
+            self.metrics.queue_dropped += 1
+
+        self._items.append(state)
+        self.metrics.queue_high_water = max(
+            self.metrics.queue_high_water, len(self._items)
+        )
+        self._ready.set()
+
+    def _victim(self) -> int | None:
+        """Return the index of the message to drop when full.
+
+        The oldest partial read goes first, then the oldest full read. Acks
+        are never dropped, a queue holding only acks grows past maxsize.
+        """
+        full = None
+        for i, item in enumerate(self._items):
+            if item.ack:
+                continue
+            if not item.full:
+                return i
+            if full is None:
+                full = i
+        return full
+
+    async def get(self) -> ReclaimState:
+        """Wait for and return the oldest queued message."""
+        while not self._items:
+            self._ready.clear()
+            await self._ready.wait()
+        return self._items.popleft()
+
+
+def create_tls_context(cacert: str, certificate: str, key: str) -> ssl.SSLContext:
+    """Create a TLS context for AWS IoT from the credential files."""
+    tls_context = ssl.create_default_context(ssl.Purpose.SERVER_AUTH)
+    tls_context.load_verify_locations(cafile=cacert)
+    tls_context.load_cert_chain(certfile=certificate, keyfile=key)
+    tls_context.verify_mode = ssl.CERT_REQUIRED
+    tls_context.minimum_version = ssl.TLSVersion.TLSv1_2
+    return tls_context
+
+
+class TLSContextCache:
+    """TLS contexts shared by all units using the same credential files.
+
+    A context is rebuilt only when the modification time of one of its files
+    changes. If the new files cannot be read or loaded (e.g. a certificate
+    and key pair caught mid rotation) the previous context is kept.
+    """
+
+    def __init__(self) -> None:
+        """Initialise cache."""
+        # (cacert, certificate, key) -> (file mtimes, context)
+        self._contexts: dict[tuple, tuple[tuple, ssl.SSLContext]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, cacert: str, certificate: str, key: str) -> ssl.SSLContext:
+        """Return a context for the files, this does blocking file I/O."""
+        files = (cacert, certificate, key)
+        with self._lock:
+            cached = self._contexts.get(files)
+            try:
+                stamp = tuple(os.stat(f).st_mtime_ns for f in files)
+                if cached and cached[0] == stamp:
+                    return cached[1]
+                context = create_tls_context(*files)
+            except OSError as e:
+                # ssl.SSLError included, a file may also be missing for a moment
+                if not cached:
+                    raise
+                _LOGGER.warning("Unable to load new credentials, keeping old: %s", e)
+                return cached[1]
+
+            self._contexts[files] = (stamp, context)
+            return context
+
+
+tls_contexts = TLSContextCache()
+
+
 class ReclaimV2:
     """ReclaimV2 HPHWS Controller."""
 
-    def __init__(self, unique_id: int, cacert: str, certificate: str, key: str) -> None:
-        """Initialize."""
+    def __init__(
+        self,
+        unique_id: int,
+        cacert: str,
+        certificate: str,
+        key: str,
+        on_demand: bool = False,
+        publish_policies: dict[str, PublishPolicy] | None = None,
+        hostname: str = AWS_HOSTNAME,
+        port: int = AWS_PORT,
+        tls: bool = True,
+    ) -> None:
+        """Initialize.
+
+        In on demand mode the MQTT session is only held until a full update
+        has been received and all writes are acknowledged, unless a
+        persistent session has been requested with keep_connected().
+
+        publish_policies overrides entries of PUBLISH_POLICIES. hostname, port
+        and tls select another broker, such as a local one for testing.
+        """
         self.unique_id = unique_id
         self.cacert = cacert
         self.certificate = certificate
         self.key = key
+        self.hostname = hostname
+        self.port = port
+        self.tls = tls
+        self.on_demand = on_demand
+        self.publish_policies = {**PUBLISH_POLICIES, **(publish_policies or {})}
 
         self._client = None
         self._connected = False
         self._listener_task = None
+        self._dispatch_task = None
+        self._update_requested: float | None = None
+        self._tls_context: ssl.SSLContext | None = None
+
+        self._persistent = False
+        self._wake = asyncio.Event()
+        self._session_updated = False
+        # address -> encoded value, waiting for a connection
+        self._queued_writes: dict[int, int] = {}
+        # address -> (encoded value, time sent), waiting for an ack
+        self._pending_writes: dict[int, tuple[int, float]] = {}
+        # address -> (value, time received) last reported by the controller
+        self._confirmed: dict[int, tuple[int, float]] = {}
+        # start register -> (time sent, count), for reads not answered yet,
+        # the time is None once a write makes the read stale
+        self._reads_in_flight: dict[int, tuple[float | None, int]] = {}
+        # callers waiting for the next full read
+        self._update_waiters: list[asyncio.Future[ReclaimState]] = []
+        # callers waiting for the next write ack
+        self._ack_waiters: list[asyncio.Future[None]] = []
+
+        self.metrics = PipelineMetrics()
+        self._queue = MessageQueue(self.metrics)
+
+        # layout of full reads decoding only the registers it wants, full
+        # reads of any other layout keep every register
+        self.layout: codec.Layout | None = None
+        # whether the latest full read had that layout
+        self.layout_matched = False
 
         hexid = f"{self.unique_id:#016x}"[2:-2]
         self.subscribe_topic = f"dontek{hexid}/status/psw"
@@ -189,122 +422,388 @@ class ReclaimV2:
 
     def connect(self, listener: MessageListener) -> None:
         """Connect to MQTT server and subscribe for updates."""
-        self._listener_task = asyncio.create_task(self._listen(listener))
-
-    def _create_tls_context(self):
-        tls_context = ssl.create_default_context(ssl.Purpose.SERVER_AUTH)
-        tls_context.load_verify_locations(cafile=self.cacert)
-        tls_context.load_cert_chain(certfile=self.certificate, keyfile=self.key)
-        tls_context.verify_mode = ssl.CERT_REQUIRED
-        tls_context.minimum_version = ssl.TLSVersion.TLSv1_2
-        return tls_context
-
-    async def _listen(self, listener: MessageListener):
+        self._wake.set()
+        self._listener_task = asyncio.create_task(self._listen())
+        self._dispatch_task = asyncio.create_task(self._dispatch(listener))
+
+    async def refresh_tls_context(self) -> bool:
+        """Reload the TLS context if the credential files have changed.
+
+        The new context is used from the next reconnect, an established
+        session is left running. Returns True if the context changed.
+        """
+        if not self.tls:
+            return False
         loop = asyncio.get_running_loop()
-        tls_context = await loop.run_in_executor(None, self._create_tls_context)
-
+        tls_context = await loop.run_in_executor(
+            None, tls_contexts.get, self.cacert, self.certificate, self.key
+        )
+        changed = self._tls_context is not None and tls_context is not self._tls_context
+        self._tls_context = tls_context
+        return changed
+
+    def keep_connected(self, persistent: bool) -> None:
+        """Hold a persistent session in on demand mode."""
+        self._persistent = persistent
+        if persistent:
+            self._wake.set()
+
+    def _stay_connected(self) -> bool:
+        """Return True if the MQTT session should be held open."""
+        if not self.on_demand or self._persistent or self._queued_writes:
+            return True
+
+        # forget writes which were never acknowledged
+        now = time.monotonic()
+        for address, (_, sent) in list(self._pending_writes.items()):
+            if now - sent > WRITE_ACK_TIMEOUT:
+                del self._pending_writes[address]
+
+        return bool(self._pending_writes)
+
+    async def _listen(self):
         self._connected = True
         while self._connected:
+            if not self._stay_connected():
+                await self._wake.wait()
+            self._wake.clear()
+
             try:
+                await self.refresh_tls_context()
                 async with aiomqtt.Client(
-                    hostname=AWS_HOSTNAME, port=AWS_PORT, tls_context=tls_context
+                    hostname=self.hostname,
+                    port=self.port,
+                    tls_context=self._tls_context,
                 ) as self._client:
                     _LOGGER.debug("Connected, subscribing to %s", self.subscribe_topic)
+                    self.metrics.connects += 1
+                    self._session_updated = False
+                    self._reads_in_flight.clear()
                     await self._client.subscribe(self.subscribe_topic)
 
+                    # send writes made while disconnected
+                    while self._queued_writes:
+                        address, value = self._queued_writes.popitem()
+                        if not await self._publish_write(address, value):
+                            # keep it for the next session
+                            self._queued_writes[address] = value
+                            break
+
                     # request initial update
                     await self.request_update()
 
                     # process messages
                     async for message in self._client.messages:
-                        self._process_message(message, listener)
+                        self._process_message(message)
+                        if self._session_updated and not self._stay_connected():
+                            _LOGGER.debug("Update received, disconnecting")
+                            break
 
             except aiomqtt.MqttError as mqtt_err:
                 _LOGGER.warning("Waiting for retry, error: %s", mqtt_err)
-                self._client = None
+                self.metrics.mqtt_errors += 1
             except Exception as e:  # noqa: BLE001
                 _LOGGER.error("Exception in MQTT loop: %s", e)
             finally:
-                await asyncio.sleep(5)
+                self._client = None
+
+            if self._stay_connected():
+                await asyncio.sleep(RECONNECT_DELAY)
+
+    async def resubscribe(self) -> None:
+        """Subscribe to the status topic again on the current session."""
+        if self._client:
+            try:
+                await self._client.subscribe(self.subscribe_topic)
+            except aiomqtt.exceptions.MqttError as e:
+                _LOGGER.error("Error resubscribing: %s", e)
+
+    async def reconnect(self) -> None:
+        """Drop the MQTT session and establish a new one."""
+        if self._listener_task is None:
+            return
+        self._listener_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._listener_task
+        self._wake.set()
+        self._listener_task = asyncio.create_task(self._listen())
 
     async def disconnect(self) -> None:
         """Disconnect from MQTT Server."""
         if self._listener_task is None:
             return
         self._connected = False
-        self._listener_task.cancel()
-        try:
-            await self._listener_task
-        except asyncio.CancelledError:
-            _LOGGER.debug("listener is cancelled")
+        for task in (self._listener_task, self._dispatch_task):
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                _LOGGER.debug("listener is cancelled")
         self._listener_task = None
+        self._dispatch_task = None
         self._client = None
 
-    def _process_message(self, message, listener: MessageListener):
+    def _process_message(self, message):
+        now = time.monotonic()
+        self.metrics.messages.hit(now)
         try:
-            payload = json.loads(message.payload)
-            if payload["messageId"] == "read" and payload["modbusReg"] == 1:
+            payload = codec.loads(message.payload)
+            message_id = payload.get("messageId")
+            register = payload.get("modbusReg")
+            if message_id not in ("read", "write") or not isinstance(register, int):
+                self.metrics.unknown_payloads += 1
+                _LOGGER.warning("Unknown payload: %s", payload)
+            elif message_id == "read" and register == 1:
                 # full modbus packet with all values
-                raw = payload["modbusVal"]
-                data = {raw[i]: raw[i + 1] for i in range(0, len(raw), 2)}
+                values = payload["modbusVal"]
+                data = self.layout.registers(values) if self.layout else None
+                if not (matched := data is not None):
+                    data = codec.registers(values)
+                self.layout_matched = matched
                 _LOGGER.debug("Received modbus data: %s", data)
-                state = ReclaimState(data)
-                listener.on_message(state)
-            elif payload["messageId"] == "write":
+                self.metrics.full_reads += 1
+                self._confirm(data, now)
+                self._session_updated = True
+                self._reads_in_flight.pop(1, None)
+                if self._update_requested is not None:
+                    self.metrics.update_latency.record(now - self._update_requested)
+                    self._update_requested = None
+                state = ReclaimState(data, full=True)
+                for waiter in self._update_waiters:
+                    if not waiter.done():
+                        waiter.set_result(state)
+                self._update_waiters.clear()
+                self._queue.put(state)
+            elif message_id == "read":
+                # targeted read, values are consecutive from modbusReg
+                values = payload["modbusVal"]
+                _, count = self._reads_in_flight.pop(register, (None, None))
+                if len(values) != count:
+                    raise ValueError(
+                        f"{len(values)} values from {register}, requested {count}"
+                    )
+                data = codec.consecutive(register, values)
+                _LOGGER.debug("Received partial modbus data: %s", data)
+                self.metrics.partial_reads += 1
+                self._confirm(data, now)
+                self._queue.put(ReclaimState(data))
+            else:
                 # ack of a command, process so the entities are updated
                 values = payload["modbusVal"]
                 if len(values) == 1:
-                    state = ReclaimState({payload["modbusReg"]: values[0]})
+                    self.metrics.write_acks += 1
+                    self._pending_writes.pop(register, None)
+                    self._confirmed[register] = (values[0], now)
+                    for waiter in self._ack_waiters:
+                        if not waiter.done():
+                            waiter.set_result(None)
+                    self._ack_waiters.clear()
+                    state = ReclaimState({register: values[0]}, ack=True)
                     _LOGGER.debug("Received modbus data: %s", payload)
-                    listener.on_message(state)
-            else:
-                _LOGGER.warning("Unknown payload: %s", payload)
-        except (json.JSONDecodeError, IndexError, AttributeError) as e:
+                    self._queue.put(state)
+        except (KeyError, TypeError, ValueError, IndexError, AttributeError) as e:
+            # invalid JSON, a payload which is not an object or bad values
+            self.metrics.decode_errors += 1
             _LOGGER.error("Error processing payload(%s): %s", e, message.payload)
 
+    def _confirm(self, data: dict[int, int], now: float) -> None:
+        """Record register values reported by the controller."""
+        self._confirmed.update((address, (v, now)) for address, v in data.items())
+
+    def _holds(self, address: int, value: int) -> bool:
+        """Return True if a register recently held value and no write is pending.
+
+        An outstanding write may still change the register, so it is never
+        assumed to hold its previous value.
+        """
+        now = time.monotonic()
+        if address in self._queued_writes:
+            return False
+        if (pending := self._pending_writes.get(address)) is not None:
+            if now - pending[1] < WRITE_ACK_TIMEOUT:
+                return False
+        confirmed = self._confirmed.get(address)
+        return (
+            confirmed is not None
+            and confirmed[0] == value
+            and now - confirmed[1] < CONFIRMED_VALUE_MAX_AGE
+        )
+
+    async def _dispatch(self, listener: MessageListener):
+        while True:
+            state = await self._queue.get()
+            start = time.monotonic()
+            try:
+                listener.on_message(state)
+            except Exception as e:  # noqa: BLE001
+                _LOGGER.error("Exception in message listener: %s", e)
+            self.metrics.dispatch_time.record(time.monotonic() - start)
+
     async def request_update(self) -> None:
         """Send MQTT update request to controller."""
         if not self._connected:
             _LOGGER.warning("Not connected")
             return
 
+        if self._client is None and self.on_demand:
+            # an update is requested as soon as the session is established
+            self._wake.set()
+            return
+
         if self._client:
             try:
-                await self._client.publish(
-                    self.command_topic,
-                    json.dumps({"messageId": "read", "modbusReg": 1, "modbusVal": [1]}),
-                    qos=1,
-                )
+                now = time.monotonic()
+                if await self._publish_read(1, 1):
+                    self._update_requested = now
             except aiomqtt.exceptions.MqttError as e:
+                self.metrics.publish_errors += 1
                 _LOGGER.error("Error publishing update request: %s", e)
 
-    async def set_value(self, name: str, value: Any) -> None:
-        """Send MQTT message to turn on boost mode."""
+    def _writes_outstanding(self) -> bool:
+        """Return True while writes are queued or waiting for their ack."""
+        now = time.monotonic()
+        return bool(self._queued_writes) or any(
+            now - sent < WRITE_ACK_TIMEOUT for _, sent in self._pending_writes.values()
+        )
+
+    async def refresh(self, timeout: float) -> ReclaimState | None:
+        """Request a full update reflecting all writes made and wait for it.
+
+        The controller answers in order, so once the writes are acknowledged
+        a full read cannot be the answer to a poll sent before them.
+        """
+        loop = asyncio.get_running_loop()
+
+        async def _refresh() -> ReclaimState:
+            while self._writes_outstanding():
+                ack = loop.create_future()
+                self._ack_waiters.append(ack)
+                try:
+                    # pending writes expire without an ack, look again then
+                    await asyncio.wait_for(ack, WRITE_ACK_TIMEOUT)
+                except TimeoutError:
+                    pass
+                finally:
+                    if ack in self._ack_waiters:
+                        self._ack_waiters.remove(ack)
+
+            waiter = loop.create_future()
+            self._update_waiters.append(waiter)
+            try:
+                await self.request_update()
+                return await waiter
+            finally:
+                if waiter in self._update_waiters:
+                    self._update_waiters.remove(waiter)
+
+        try:
+            return await asyncio.wait_for(_refresh(), timeout)
+        except TimeoutError:
+            return None
+
+    async def request_registers(self, blocks: tuple[tuple[int, int], ...]) -> None:
+        """Request specific register blocks (start, count) from the controller."""
         if not self._connected:
             _LOGGER.warning("Not connected")
             return
 
-        entry = ReclaimState.modbus_map[name]
-        if not entry[2]:
-            _LOGGER.warning("This value is readonly and cannot be set")
+        if self._client is None and self.on_demand:
+            self._wake.set()
             return
 
         if self._client:
             try:
-                value = entry[2](value)
-                await self._client.publish(
-                    self.command_topic,
-                    json.dumps(
-                        {
-                            "messageId": "write",
-                            "modbusReg": entry[0],
-                            "modbusVal": [value],
-                        }
-                    ),
-                    qos=1,
-                )
+                for start, count in blocks:
+                    await self._publish_read(start, count)
             except aiomqtt.exceptions.MqttError as e:
-                _LOGGER.error("Error publishing value request: %s", e)
+                self.metrics.publish_errors += 1
+                _LOGGER.error("Error publishing register request: %s", e)
+
+    async def set_value(self, name: str, value: Any, force: bool = False) -> bool:
+        """Write a value to a register.
+
+        The write is skipped if the register was recently confirmed to hold
+        the value already, unless force is set. Returns True if the write was
+        sent or queued for the next session.
+        """
+        if not self._connected:
+            _LOGGER.warning("Not connected")
+            return False
+
+        entry = ReclaimState.modbus_map[name]
+        if not entry.encode:
+            _LOGGER.warning("This value is readonly and cannot be set")
+            return False
+
+        encoded = entry.encode(value)
+        if not force and self._holds(entry.address, encoded):
+            _LOGGER.debug("%s is already %s, not writing", name, value)
+            self.metrics.writes_suppressed += 1
+            return False
+
+        if self._client is None and self.on_demand:
+            self._queued_writes[entry.address] = encoded
+            self._wake.set()
+            return True
+
+        if self._client:
+            return await self._publish_write(entry.address, encoded)
+        return False
+
+    async def set_values(self, values: dict[str, Any], force: bool = False) -> None:
+        """Write several values without waiting for each to be acknowledged."""
+        await asyncio.gather(
+            *(self.set_value(name, value, force) for name, value in values.items())
+        )
+
+    async def _publish_read(self, start: int, count: int) -> bool:
+        """Publish a read unless an identical one is still unanswered.
+
+        Returns False if the read was superseded by the one in flight.
+        """
+        policy = self.publish_policies["poll"]
+        now = time.monotonic()
+        sent, _ = self._reads_in_flight.get(start, (None, count))
+        if sent is not None and now - sent < policy.supersede:
+            self.metrics.polls_superseded += 1
+            return False
+
+        self._reads_in_flight[start] = (now, count)
+        await self._client.publish(
+            self.command_topic,
+            json.dumps({"messageId": "read", "modbusReg": start, "modbusVal": [count]}),
+            qos=policy.qos,
+        )
+        return True
+
+    async def _publish_write(self, address: int, value: int) -> bool:
+        """Publish a write, return True if it was sent."""
+        try:
+            self._pending_writes[address] = (value, time.monotonic())
+            # a read sent before the write must not stand in for a later one,
+            # its count is kept to check the answer
+            self._reads_in_flight = {
+                start: (None, count)
+                for start, (_, count) in self._reads_in_flight.items()
+            }
+            await self._client.publish(
+                self.command_topic,
+                json.dumps(
+                    {
+                        "messageId": "write",
+                        "modbusReg": address,
+                        "modbusVal": [value],
+                    }
+                ),
+                qos=self.publish_policies["write"].qos,
+            )
+        except aiomqtt.exceptions.MqttError as e:
+            self.metrics.publish_errors += 1
+            _LOGGER.error("Error publishing value request: %s", e)
+            # no ack will come for it
+            self._pending_writes.pop(address, None)
+            return False
+        return True
 
 
 async def main():
@@ -0,0 +1,119 @@
+"""Poll scheduler shared by all Reclaim units."""
+
+from collections.abc import Callable, Coroutine
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import logging
+import time
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_SCHEDULER = f"{DOMAIN}_scheduler"
+
+TICK_INTERVAL = timedelta(seconds=1)
+
+# maximum number of polls started per tick across all units
+MAX_POLLS_PER_TICK = 2
+
+
+@dataclass
+class _Unit:
+    poll: Callable[[], Coroutine[Any, Any, None]]
+    interval: float
+    phase: float = 0
+    due: float = 0
+
+
+@callback
+def async_get_scheduler(hass: HomeAssistant) -> "ReclaimPollScheduler":
+    """Return the scheduler shared by all config entries."""
+    if DATA_SCHEDULER not in hass.data:
+        hass.data[DATA_SCHEDULER] = ReclaimPollScheduler(hass)
+    return hass.data[DATA_SCHEDULER]
+
+
+class ReclaimPollScheduler:
+    """Spread polls of all units evenly over their interval.
+
+    Units are ordered by unique id and each gets a fixed phase within the
+    interval, so polls land at the same wall clock offsets after a restart
+    instead of all at once. At most MAX_POLLS_PER_TICK polls start per tick,
+    any excess is deferred to the next tick.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialise scheduler."""
+        self.hass = hass
+        self._units: dict[int, _Unit] = {}
+        self._cancel_tick: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_add(
+        self,
+        unique_id: int,
+        interval: float,
+        poll: Callable[[], Coroutine[Any, Any, None]],
+    ) -> None:
+        """Start polling a unit."""
+        self._units[unique_id] = _Unit(poll=poll, interval=interval)
+        self._rebalance()
+
+        if self._cancel_tick is None:
+            self._cancel_tick = async_track_time_interval(
+                self.hass, self._tick, TICK_INTERVAL, cancel_on_shutdown=True
+            )
+
+    @callback
+    def async_remove(self, unique_id: int) -> None:
+        """Stop polling a unit."""
+        self._units.pop(unique_id, None)
+        self._rebalance()
+
+        if not self._units and self._cancel_tick:
+            self._cancel_tick()
+            self._cancel_tick = None
+
+    @callback
+    def async_set_interval(self, unique_id: int, interval: float) -> None:
+        """Change the poll interval of a unit."""
+        if (unit := self._units.get(unique_id)) is None:
+            # removed while its last messages are dispatched
+            return
+        if unit.interval != interval:
+            unit.interval = interval
+            unit.due = self._next_due(unit, time.time())
+
+    def _rebalance(self) -> None:
+        """Assign evenly spaced phases to all units."""
+        now = time.time()
+        count = len(self._units)
+        for index, unique_id in enumerate(sorted(self._units)):
+            unit = self._units[unique_id]
+            unit.phase = index / count
+            unit.due = self._next_due(unit, now)
+
+    @staticmethod
+    def _next_due(unit: _Unit, now: float) -> float:
+        """Return the next wall clock time matching the unit's phase."""
+        offset = unit.phase * unit.interval
+        return now - (now - offset) % unit.interval + unit.interval
+
+    @callback
+    def _tick(self, _: datetime) -> None:
+        now = time.time()
+        due = sorted(
+            (unit for unit in self._units.values() if unit.due <= now),
+            key=lambda unit: unit.due,
+        )
+        if len(due) > MAX_POLLS_PER_TICK:
+            _LOGGER.debug("Deferring %d polls", len(due) - MAX_POLLS_PER_TICK)
+
+        for unit in due[:MAX_POLLS_PER_TICK]:
+            unit.due = self._next_due(unit, now)
+            self.hass.async_create_background_task(unit.poll(), name=f"{DOMAIN} poll")
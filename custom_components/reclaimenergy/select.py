@@ -1,64 +1,74 @@
 """Mode selector for Heat Pump."""
 
+from dataclasses import dataclass
 import logging
+from typing import Any
 
-from homeassistant.components.select import SelectEntity
+from homeassistant.components.select import SelectEntity, SelectEntityDescription
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .entity import ReclaimV2Entity
+from .coordinator import ReclaimV2Coordinator
+from .entity import ReclaimV2EntityDescription, ReclaimV2RegisterEntity
 from .reclaimv2 import ReclaimState
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True, kw_only=True)
+class ReclaimV2SelectEntityDescription(
+    SelectEntityDescription, ReclaimV2EntityDescription
+):
+    """Describes a register with an enumerated value."""
+
+
+SELECTS: tuple[ReclaimV2SelectEntityDescription, ...] = (
+    ReclaimV2SelectEntityDescription(
+        key="operating_mode",
+        translation_key="operating_mode",
+        register="mode",
+        options=ReclaimState.modes,
+    ),
+    ReclaimV2SelectEntityDescription(
+        key="mode8_day",
+        translation_key="mode8_day",
+        entity_registry_enabled_default=False,
+        options=ReclaimState.days,
+    ),
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
-    """Set up the binary_sensor platform."""
+    """Set up the select platform."""
     async_add_entities(
-        [
-            ModeSelect(coordinator=entry.runtime_data),
-            DaySelect(coordinator=entry.runtime_data),
-        ]
+        ReclaimV2Select(entry.runtime_data, description) for description in SELECTS
     )
 
 
-class ModeSelect(ReclaimV2Entity, SelectEntity):
-    """Represents the operating mode of the heat pump."""
-
-    _attr_translation_key = "operating_mode"
-    _attr_options = ReclaimState.modes
-    _attr_current_option = _attr_options[0]
-
-    @callback
-    def _handle_coordinator_update(self) -> None:
-        if hasattr(self.coordinator.data, "mode"):
-            self._attr_current_option = self.coordinator.data.mode
-            self.async_write_ha_state()
-
-    async def async_select_option(self, option: str) -> None:
-        """Set operating mode."""
-        await self.coordinator.api.set_value("mode", option)
-
+class ReclaimV2Select(ReclaimV2RegisterEntity, SelectEntity):
+    """Represents an enumerated setting of the heat pump."""
 
-class DaySelect(ReclaimV2Entity, SelectEntity):
-    """Represents the holiday mode day."""
+    entity_description: ReclaimV2SelectEntityDescription
 
-    _attr_translation_key = "mode8_day"
-    _attr_options = ReclaimState.days
-    _attr_current_option = _attr_options[0]
-    _attr_entity_registry_enabled_default = False
+    def __init__(
+        self,
+        coordinator: ReclaimV2Coordinator,
+        description: ReclaimV2SelectEntityDescription,
+    ) -> None:
+        """Initialize the select with its first option."""
+        super().__init__(coordinator, description)
+        self._attr_current_option = description.options[0]
 
     @callback
-    def _handle_coordinator_update(self) -> None:
-        if hasattr(self.coordinator.data, "mode8_day"):
-            self._attr_current_option = self.coordinator.data.mode8_day
-            self.async_write_ha_state()
+    def _update_value(self, value: Any) -> None:
+        self._attr_current_option = value
+        self.async_write_ha_state()
 
     async def async_select_option(self, option: str) -> None:
-        """Set operating mode."""
-        await self.coordinator.api.set_value("mode8_day", option)
+        """Set option."""
+        await self._async_write_register(option)
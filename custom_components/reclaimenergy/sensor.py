@@ -1,187 +1,314 @@
 """Sensors for Heat Pump Power and Temperatures."""
 
+from collections.abc import Callable
+from dataclasses import dataclass
 import logging
+import time
+from typing import Any
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorEntity,
+    SensorEntityDescription,
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
+    EntityCategory,
     UnitOfElectricCurrent,
     UnitOfPower,
     UnitOfTemperature,
     UnitOfTime,
 )
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.typing import StateType
 
-from .entity import ReclaimV2Entity
+from .const import DOMAIN
+from .coordinator import ReclaimV2Coordinator
+from .entity import ReclaimV2Entity, ReclaimV2EntityDescription, ReclaimV2RegisterEntity
+from .fleet import FleetAggregate, async_get_fleet
+from .metrics import PipelineMetrics
 
 _LOGGER = logging.getLogger(__name__)
 
 
-async def async_setup_entry(
-    hass: HomeAssistant,
-    entry: ConfigEntry,
-    async_add_entities: AddEntitiesCallback,
-) -> None:
-    """Set up the sensor platform."""
-    async_add_entities(
-        [
-            WaterTempSensor(coordinator=entry.runtime_data),
-            OutletTempSensor(coordinator=entry.runtime_data),
-            InletTempSensor(coordinator=entry.runtime_data),
-            DischargeTempSensor(coordinator=entry.runtime_data),
-            SuctionTempSensor(coordinator=entry.runtime_data),
-            EvaporatorTempSensor(coordinator=entry.runtime_data),
-            AmbientTempSensor(coordinator=entry.runtime_data),
-            CaseTempSensor(coordinator=entry.runtime_data),
-            PowerSensor(coordinator=entry.runtime_data),
-            CurrentSensor(coordinator=entry.runtime_data),
-            CompressorHours(coordinator=entry.runtime_data),
-            CompressorStarts(coordinator=entry.runtime_data),
-            FanSpeed(coordinator=entry.runtime_data),
-            CompressorSpeed(coordinator=entry.runtime_data),
-            WaterPumpSpeed(coordinator=entry.runtime_data),
-        ]
-    )
-
-
-class ReclaimV2SensorBase(ReclaimV2Entity, SensorEntity):
-    """Base class for reclaim sensors."""
-
-    @callback
-    def _handle_coordinator_update(self) -> None:
-        if hasattr(self.coordinator.data, self._attr_translation_key):
-            self._attr_native_value = getattr(
-                self.coordinator.data, self._attr_translation_key
-            )
-            self.async_write_ha_state()
-
-
-class ReclaimV2SensorTemp(ReclaimV2SensorBase):
-    """Base class of temperature sensors."""
-
-    _attr_device_class = SensorDeviceClass.TEMPERATURE
-    _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
-    _attr_state_class = SensorStateClass.MEASUREMENT
-
-
-class WaterTempSensor(ReclaimV2SensorTemp):
-    """Represents the current water temperature at the bottom sensor."""
-
-    _attr_translation_key = "water"
-
-
-class OutletTempSensor(ReclaimV2SensorTemp):
-    """Represents the current water temperature at the outlet."""
-
-    _attr_entity_registry_enabled_default = False
-    _attr_translation_key = "outlet"
-
+@dataclass(frozen=True, kw_only=True)
+class ReclaimV2SensorEntityDescription(
+    SensorEntityDescription, ReclaimV2EntityDescription
+):
+    """Describes a register sensor.
 
-class InletTempSensor(ReclaimV2SensorTemp):
-    """Represents the current water temperature at the inlet."""
+    Changes smaller than the deadband are not written to the state machine
+    unless max_silence seconds have passed since the last write. When
+    long-term statistics are enabled, sensors with imported_statistics have
+    theirs imported by statistics.py instead of compiled by the recorder.
+    """
 
-    _attr_entity_registry_enabled_default = False
-    _attr_translation_key = "inlet"
+    deadband: float = 0
+    max_silence: float = 900
+    imported_statistics: bool = False
 
 
-class DischargeTempSensor(ReclaimV2SensorTemp):
-    """Represents the discharge temperature."""
+@dataclass(frozen=True, kw_only=True)
+class ReclaimV2DiagnosticSensorEntityDescription(SensorEntityDescription):
+    """Describes an MQTT pipeline diagnostic sensor."""
 
-    _attr_entity_registry_enabled_default = False
-    _attr_translation_key = "discharge"
+    value_fn: Callable[[PipelineMetrics], StateType]
 
+    entity_category: EntityCategory = EntityCategory.DIAGNOSTIC
+    entity_registry_enabled_default: bool = False
+    state_class: SensorStateClass = SensorStateClass.MEASUREMENT
 
-class SuctionTempSensor(ReclaimV2SensorTemp):
-    """Represents the current suction temperature."""
 
-    _attr_entity_registry_enabled_default = False
-    _attr_translation_key = "suction"
+@dataclass(frozen=True, kw_only=True)
+class ReclaimV2FleetSensorEntityDescription(SensorEntityDescription):
+    """Describes an aggregate of all units."""
 
+    value_fn: Callable[[FleetAggregate], StateType]
 
-class EvaporatorTempSensor(ReclaimV2SensorTemp):
-    """Represents the current evaporator temperature."""
+    state_class: SensorStateClass = SensorStateClass.MEASUREMENT
 
-    _attr_entity_registry_enabled_default = False
-    _attr_translation_key = "evaporator"
 
+def _temperature(key: str, **kwargs: Any) -> ReclaimV2SensorEntityDescription:
+    return ReclaimV2SensorEntityDescription(
+        key=key,
+        translation_key=key,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        deadband=1.0,
+        **kwargs,
+    )
 
-class AmbientTempSensor(ReclaimV2SensorTemp):
-    """Represents the ambient temperature at the heat pump unit."""
-
-    _attr_translation_key = "ambient"
 
+def _speed(key: str) -> ReclaimV2SensorEntityDescription:
+    return ReclaimV2SensorEntityDescription(
+        key=key,
+        translation_key=key,
+        entity_registry_enabled_default=False,
+        native_unit_of_measurement="rpm",
+        state_class=SensorStateClass.MEASUREMENT,
+        deadband=50,
+    )
 
-class CaseTempSensor(ReclaimV2SensorTemp):
-    """Represents the case temperature at the heat pump unit."""
 
-    _attr_entity_registry_enabled_default = False
-    _attr_translation_key = "case"
+SENSORS: tuple[ReclaimV2SensorEntityDescription, ...] = (
+    _temperature("water", imported_statistics=True),
+    _temperature("outlet", entity_registry_enabled_default=False),
+    _temperature("inlet", entity_registry_enabled_default=False),
+    _temperature("discharge", entity_registry_enabled_default=False),
+    _temperature("suction", entity_registry_enabled_default=False),
+    _temperature("evaporator", entity_registry_enabled_default=False),
+    _temperature("ambient", imported_statistics=True),
+    _temperature("case", entity_registry_enabled_default=False),
+    ReclaimV2SensorEntityDescription(
+        key="power",
+        translation_key="power",
+        device_class=SensorDeviceClass.POWER,
+        native_unit_of_measurement=UnitOfPower.WATT,
+        state_class=SensorStateClass.MEASUREMENT,
+        deadband=20,
+        imported_statistics=True,
+    ),
+    ReclaimV2SensorEntityDescription(
+        key="current",
+        translation_key="current",
+        entity_registry_enabled_default=False,
+        device_class=SensorDeviceClass.CURRENT,
+        native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
+        state_class=SensorStateClass.MEASUREMENT,
+        deadband=0.1,
+    ),
+    ReclaimV2SensorEntityDescription(
+        key="hours",
+        translation_key="hours",
+        entity_registry_enabled_default=False,
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.HOURS,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        imported_statistics=True,
+    ),
+    ReclaimV2SensorEntityDescription(
+        key="starts",
+        translation_key="starts",
+        entity_registry_enabled_default=False,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+    _speed("fanspeed"),
+    _speed("compspeed"),
+    _speed("waterspeed"),
+)
 
+DIAGNOSTIC_SENSORS: tuple[ReclaimV2DiagnosticSensorEntityDescription, ...] = (
+    ReclaimV2DiagnosticSensorEntityDescription(
+        key="messages_per_minute",
+        translation_key="messages_per_minute",
+        native_unit_of_measurement="messages/min",
+        value_fn=lambda metrics: metrics.messages.per_minute(time.monotonic()),
+    ),
+    ReclaimV2DiagnosticSensorEntityDescription(
+        key="decode_errors",
+        translation_key="decode_errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.decode_errors,
+    ),
+    ReclaimV2DiagnosticSensorEntityDescription(
+        key="update_latency",
+        translation_key="update_latency",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        suggested_display_precision=2,
+        value_fn=lambda metrics: metrics.update_latency.last,
+    ),
+)
 
-class PowerSensor(ReclaimV2SensorBase):
-    """Represents the current power usage of the heat pump."""
+FLEET_SENSORS: tuple[ReclaimV2FleetSensorEntityDescription, ...] = (
+    ReclaimV2FleetSensorEntityDescription(
+        key="fleet_power",
+        translation_key="fleet_power",
+        device_class=SensorDeviceClass.POWER,
+        native_unit_of_measurement=UnitOfPower.WATT,
+        value_fn=lambda fleet: fleet.total_power,
+    ),
+    ReclaimV2FleetSensorEntityDescription(
+        key="fleet_running",
+        translation_key="fleet_running",
+        icon="mdi:heat-pump",
+        value_fn=lambda fleet: fleet.running,
+    ),
+    ReclaimV2FleetSensorEntityDescription(
+        key="fleet_water",
+        translation_key="fleet_water",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        suggested_display_precision=1,
+        value_fn=lambda fleet: fleet.average_water,
+    ),
+)
 
-    _attr_device_class = SensorDeviceClass.POWER
-    _attr_native_unit_of_measurement = UnitOfPower.WATT
-    _attr_state_class = SensorStateClass.MEASUREMENT
-    _attr_translation_key = "power"
 
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the sensor platform."""
+    coordinator = entry.runtime_data
+    entities: list[SensorEntity] = [
+        *(ReclaimV2Sensor(coordinator, description) for description in SENSORS),
+        *(
+            ReclaimV2DiagnosticSensor(coordinator, description)
+            for description in DIAGNOSTIC_SENSORS
+        ),
+    ]
 
-class CurrentSensor(ReclaimV2SensorBase):
-    """Represents the current power usage of the heat pump."""
+    async_add_entities(entities)
 
-    _attr_entity_registry_enabled_default = False
-    _attr_device_class = SensorDeviceClass.CURRENT
-    _attr_native_unit_of_measurement = UnitOfElectricCurrent.AMPERE
-    _attr_state_class = SensorStateClass.MEASUREMENT
-    _attr_translation_key = "current"
+    # one loaded entry provides the fleet sensors, the provider is removed
+    # once the platforms are unloaded so the next one can take them over
+    fleet = async_get_fleet(hass)
 
+    @callback
+    def async_add_fleet_sensors() -> None:
+        async_add_entities(
+            ReclaimV2FleetSensor(fleet, description) for description in FLEET_SENSORS
+        )
 
-class CompressorHours(ReclaimV2SensorBase):
-    """Represents the operating hours of the heat pump."""
+    entry.async_on_unload(
+        fleet.async_add_provider(entry.entry_id, async_add_fleet_sensors)
+    )
 
-    _attr_entity_registry_enabled_default = False
-    _attr_device_class = SensorDeviceClass.DURATION
-    _attr_native_unit_of_measurement = UnitOfTime.HOURS
-    _attr_state_class = SensorStateClass.TOTAL_INCREASING
-    _attr_translation_key = "hours"
 
+class ReclaimV2Sensor(ReclaimV2RegisterEntity, SensorEntity):
+    """Represents a register of the heat pump."""
 
-class CompressorStarts(ReclaimV2SensorBase):
-    """Represents the number of cycles of the heat pump."""
+    entity_description: ReclaimV2SensorEntityDescription
 
-    _attr_entity_registry_enabled_default = False
-    _attr_state_class = SensorStateClass.TOTAL_INCREASING
-    _attr_translation_key = "starts"
+    _last_write: float | None = None
 
+    def __init__(
+        self,
+        coordinator: ReclaimV2Coordinator,
+        description: ReclaimV2SensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, description)
+        if coordinator.statistics and description.imported_statistics:
+            # statistics are imported directly, see statistics.py
+            self._attr_state_class = None
 
-class WaterPumpSpeed(ReclaimV2SensorBase):
-    """Represents water pump speed."""
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        if not self.coordinator.last_update_success:
+            # write the next value regardless of the deadband
+            self._last_write = None
+        super()._handle_coordinator_update()
 
-    _attr_entity_registry_enabled_default = False
-    _attr_native_unit_of_measurement = "rpm"
-    _attr_state_class = SensorStateClass.MEASUREMENT
-    _attr_translation_key = "waterspeed"
+    @callback
+    def _update_value(self, value: Any) -> None:
+        if self._significant(value):
+            self._attr_native_value = value
+            self._last_write = time.monotonic()
+            self.async_write_ha_state()
 
+    def _significant(self, value: Any) -> bool:
+        """Return True if value should be written to the state machine."""
+        previous = self._attr_native_value
+        if self._last_write is None or previous is None or value is None:
+            return True
+        if time.monotonic() - self._last_write >= self.entity_description.max_silence:
+            return True
+        if not self.entity_description.deadband:
+            return value != previous
+        return abs(value - previous) >= self.entity_description.deadband
 
-class CompressorSpeed(ReclaimV2SensorBase):
-    """Represents compressor speed."""
 
-    _attr_entity_registry_enabled_default = False
-    _attr_native_unit_of_measurement = "rpm"
-    _attr_state_class = SensorStateClass.MEASUREMENT
-    _attr_translation_key = "compspeed"
+class ReclaimV2DiagnosticSensor(ReclaimV2Entity, SensorEntity):
+    """Represents an MQTT pipeline metric."""
 
+    entity_description: ReclaimV2DiagnosticSensorEntityDescription
 
-class FanSpeed(ReclaimV2SensorBase):
-    """Represents fan speed."""
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self._attr_native_value = self.entity_description.value_fn(
+            self.coordinator.api.metrics
+        )
+        self.async_write_ha_state()
+
+
+class ReclaimV2FleetSensor(SensorEntity):
+    """Represents an aggregate of all units."""
+
+    entity_description: ReclaimV2FleetSensorEntityDescription
+
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+
+    def __init__(
+        self, fleet: FleetAggregate, description: ReclaimV2FleetSensorEntityDescription
+    ) -> None:
+        """Initialize the fleet sensor."""
+        self.fleet = fleet
+        self.entity_description = description
+        self._attr_unique_id = f"{DOMAIN}_{description.key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, "fleet")},
+            manufacturer="Reclaim Energy",
+            name="Reclaim Fleet",
+        )
+        self._attr_native_value = description.value_fn(fleet)
+
+    async def async_added_to_hass(self) -> None:
+        """Follow the fleet totals."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self.fleet.async_add_listener(self._handle_fleet_update))
+        self._handle_fleet_update()
 
-    _attr_entity_registry_enabled_default = False
-    _attr_native_unit_of_measurement = "rpm"
-    _attr_state_class = SensorStateClass.MEASUREMENT
-    _attr_translation_key = "fanspeed"
+    @callback
+    def _handle_fleet_update(self) -> None:
+        value = self.entity_description.value_fn(self.fleet)
+        if value != self._attr_native_value:
+            self._attr_native_value = value
+            self.async_write_ha_state()
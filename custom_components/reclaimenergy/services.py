@@ -0,0 +1,338 @@
+"""Services for the Reclaim Energy integration."""
+
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .config_flow import rotate_aws_keys
+from .const import CONF_CACERT_PATH, CONF_CERT_PATH, CONF_KEY_PATH, DOMAIN
+from .coordinator import ReclaimV2Coordinator
+from .number import NUMBERS
+from .optimizer import MODE_TIMERS, HeatingOptimizer, OptimizerConfig
+from .reclaimv2 import ReclaimState
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_ROTATE_CREDENTIALS = "rotate_credentials"
+SERVICE_PROGRAM_SCHEDULE = "program_schedule"
+SERVICE_PLAN_HEATING = "plan_heating"
+SERVICE_GET_HISTORY = "get_history"
+SERVICE_START_DISCOVERY = "start_discovery"
+SERVICE_STOP_DISCOVERY = "stop_discovery"
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_MODE = "mode"
+ATTR_ACTIVATE = "activate"
+ATTR_PRICE_ENTITY = "price_entity"
+ATTR_PRICE_ATTRIBUTE = "price_attribute"
+ATTR_PV_ENTITY = "pv_entity"
+ATTR_PV_ATTRIBUTE = "pv_attribute"
+ATTR_FEED_IN = "feed_in"
+ATTR_TARGET_TEMPERATURE = "target_temperature"
+ATTR_HOURS = "hours"
+ATTR_APPLY = "apply"
+ATTR_TRACK = "track"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_INTERVAL = "interval"
+ATTR_REGISTERS = "registers"
+
+# seconds to wait for the read back after programming a schedule
+READBACK_TIMEOUT = 30
+
+# most rows returned by get_history
+MAX_HISTORY_ROWS = 10000
+
+# schedule fields of each mode, each is stored in register mode{N}_{field}
+SCHEDULE_FIELDS: dict[int, tuple[str, ...]] = {
+    5: (
+        "timer1_start",
+        "timer1_duration",
+        "timer2_start",
+        "timer2_duration",
+        "timer2_on_temp",
+    ),
+    6: (
+        "timer1_start",
+        "timer1_duration",
+        "timer2_start",
+        "timer2_duration",
+        "timer2_on_temp",
+        "timer2_off_temp",
+    ),
+    7: ("start", "duration"),
+    8: ("day", "start"),
+}
+
+_NUMBER_RANGES = {description.key: description for description in NUMBERS}
+
+
+def _field_validator(field: str) -> Any:
+    if field.endswith("start"):
+        return cv.time
+    if field == "day":
+        return vol.In(ReclaimState.days)
+    return vol.Coerce(float)
+
+
+PROGRAM_SCHEDULE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_MODE): vol.All(vol.Coerce(int), vol.In(SCHEDULE_FIELDS)),
+        vol.Optional(ATTR_ACTIVATE, default=False): cv.boolean,
+        **{
+            vol.Optional(field): _field_validator(field)
+            for field in set().union(*SCHEDULE_FIELDS.values())
+        },
+    }
+)
+
+PLAN_HEATING_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_MODE): vol.All(vol.Coerce(int), vol.In(MODE_TIMERS)),
+        vol.Required(ATTR_PRICE_ENTITY): cv.entity_id,
+        vol.Optional(ATTR_PRICE_ATTRIBUTE, default="today"): cv.string,
+        vol.Optional(ATTR_PV_ENTITY): cv.entity_id,
+        vol.Optional(ATTR_PV_ATTRIBUTE, default="forecast"): cv.string,
+        vol.Optional(ATTR_FEED_IN, default=0.0): vol.Coerce(float),
+        vol.Optional(ATTR_TARGET_TEMPERATURE, default=55.0): vol.Coerce(float),
+        vol.Optional(ATTR_HOURS): vol.All(vol.Coerce(int), vol.Range(min=0, max=24)),
+        vol.Optional(ATTR_APPLY, default=False): cv.boolean,
+        vol.Optional(ATTR_TRACK, default=False): cv.boolean,
+    }
+)
+
+GET_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+        vol.Optional(ATTR_INTERVAL, default={"minutes": 5}): vol.All(
+            cv.time_period, cv.positive_timedelta
+        ),
+        vol.Optional(ATTR_REGISTERS, default=["water", "power"]): vol.All(
+            cv.ensure_list, [vol.In(ReclaimState.modbus_map)]
+        ),
+    }
+)
+
+DISCOVERY_SCHEMA = vol.Schema({vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string})
+
+
+def _get_coordinator(hass: HomeAssistant, entry_id: str) -> ReclaimV2Coordinator:
+    """Return the coordinator of a loaded config entry."""
+    entry = hass.config_entries.async_get_entry(entry_id)
+    if entry is None or entry.domain != DOMAIN:
+        raise ServiceValidationError(f"Unknown config entry {entry_id}")
+    if entry.state is not ConfigEntryState.LOADED:
+        raise ServiceValidationError(f"Config entry {entry.title} is not loaded")
+    return entry.runtime_data
+
+
+def schedule_registers(mode: int, schedule: dict[str, Any]) -> dict[str, Any]:
+    """Validate a schedule and return the register values to write."""
+    fields = SCHEDULE_FIELDS[mode]
+    if missing := [field for field in fields if field not in schedule]:
+        raise ServiceValidationError(f"Mode {mode} requires {', '.join(missing)}")
+
+    registers: dict[str, Any] = {}
+    for field in fields:
+        name = f"mode{mode}_{field}"
+        value = schedule[field]
+        if field.endswith("start"):
+            if value.minute != 0 or value.second != 0:
+                raise ServiceValidationError(f"{name}: only whole hours are permitted")
+            value = value.hour
+        elif description := _NUMBER_RANGES.get(name):
+            low = description.native_min_value
+            high = description.native_max_value
+            if not low <= value <= high or (value - low) % description.native_step:
+                raise ServiceValidationError(
+                    f"{name}: {value} must be between {low} and {high} "
+                    f"in steps of {description.native_step}"
+                )
+        registers[name] = value
+
+    return registers
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services."""
+
+    async def async_rotate_credentials(call: ServiceCall) -> None:
+        """Obtain new AWS IoT credentials for all units.
+
+        Each unit switches to the new credentials on its next reconnect.
+        """
+        entries = hass.config_entries.async_entries(DOMAIN)
+        credentials = {
+            (
+                entry.data[CONF_CACERT_PATH],
+                entry.data[CONF_CERT_PATH],
+                entry.data[CONF_KEY_PATH],
+            )
+            for entry in entries
+        }
+        for files in credentials:
+            if not await hass.async_add_executor_job(rotate_aws_keys, *files):
+                raise HomeAssistantError("Unable to obtain new credentials")
+
+        for entry in entries:
+            if entry.state is ConfigEntryState.LOADED:
+                await entry.runtime_data.api.refresh_tls_context()
+
+    async def async_program_schedule(call: ServiceCall) -> ServiceResponse:
+        """Write all timer registers of a mode and verify them with one read."""
+        coordinator = _get_coordinator(hass, call.data[ATTR_CONFIG_ENTRY_ID])
+        mode = call.data[ATTR_MODE]
+        registers = schedule_registers(mode, call.data)
+        if call.data[ATTR_ACTIVATE]:
+            registers["mode"] = ReclaimState.modes[mode - 1]
+
+        await coordinator.api.set_values(registers)
+
+        state = await coordinator.api.refresh(READBACK_TIMEOUT)
+        if state is None:
+            raise HomeAssistantError("No response from the controller")
+
+        failed = []
+        for name, value in registers.items():
+            register = ReclaimState.modbus_map[name]
+            if state.data.get(register.address) != register.encode(value):
+                failed.append(name)
+        if failed:
+            raise HomeAssistantError(f"Registers not applied: {', '.join(failed)}")
+
+        return {"registers": registers}
+
+    async def async_plan_heating(call: ServiceCall) -> ServiceResponse:
+        """Plan the cheapest heating windows and optionally program them."""
+        coordinator = _get_coordinator(hass, call.data[ATTR_CONFIG_ENTRY_ID])
+        optimizer = HeatingOptimizer(
+            hass,
+            coordinator,
+            OptimizerConfig(
+                mode=call.data[ATTR_MODE],
+                price_entity=call.data[ATTR_PRICE_ENTITY],
+                price_attribute=call.data[ATTR_PRICE_ATTRIBUTE],
+                pv_entity=call.data.get(ATTR_PV_ENTITY),
+                pv_attribute=call.data[ATTR_PV_ATTRIBUTE],
+                feed_in=call.data[ATTR_FEED_IN],
+                target=call.data[ATTR_TARGET_TEMPERATURE],
+                hours=call.data.get(ATTR_HOURS),
+                apply=call.data[ATTR_APPLY],
+            ),
+        )
+        plan = await optimizer.async_update()
+
+        # only one optimizer follows the forecasts of each unit
+        if coordinator.optimizer:
+            coordinator.optimizer.async_stop()
+            coordinator.optimizer = None
+        if call.data[ATTR_TRACK]:
+            optimizer.async_track()
+            coordinator.optimizer = optimizer
+
+        return {
+            "cost": plan.cost,
+            "satisfied": plan.satisfied,
+            "windows": [
+                {"start": window.start, "duration": window.duration}
+                for window in plan.windows
+            ],
+            "registers": optimizer.registers(plan),
+        }
+
+    async def async_get_history(call: ServiceCall) -> ServiceResponse:
+        """Return averaged register history from the history file."""
+        coordinator = _get_coordinator(hass, call.data[ATTR_CONFIG_ENTRY_ID])
+        start = dt_util.as_utc(call.data[ATTR_START])
+        end = dt_util.as_utc(call.data.get(ATTR_END) or dt_util.utcnow())
+        interval = call.data[ATTR_INTERVAL]
+        if end <= start:
+            raise ServiceValidationError("End must be after start")
+        if (end - start) / interval > MAX_HISTORY_ROWS:
+            raise ServiceValidationError(
+                f"At most {MAX_HISTORY_ROWS} intervals can be returned"
+            )
+
+        await coordinator.async_flush_history()
+        rows = await hass.async_add_executor_job(
+            coordinator.history.downsample,
+            start.timestamp(),
+            end.timestamp(),
+            interval.total_seconds(),
+            call.data[ATTR_REGISTERS],
+        )
+        for row in rows:
+            row["start"] = dt_util.utc_from_timestamp(row["start"]).isoformat()
+        return {"history": rows}
+
+    async def async_start_discovery(call: ServiceCall) -> None:
+        """Start recording every register the controller returns."""
+        coordinator = _get_coordinator(hass, call.data[ATTR_CONFIG_ENTRY_ID])
+        if coordinator.discovery:
+            raise ServiceValidationError("Discovery is already running")
+        await coordinator.async_start_discovery()
+
+    async def async_stop_discovery(call: ServiceCall) -> ServiceResponse:
+        """Stop discovery and return the registers found."""
+        coordinator = _get_coordinator(hass, call.data[ATTR_CONFIG_ENTRY_ID])
+        if not coordinator.discovery:
+            raise ServiceValidationError("Discovery is not running")
+        return await coordinator.async_stop_discovery()
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_ROTATE_CREDENTIALS, async_rotate_credentials
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROGRAM_SCHEDULE,
+        async_program_schedule,
+        schema=PROGRAM_SCHEDULE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PLAN_HEATING,
+        async_plan_heating,
+        schema=PLAN_HEATING_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_HISTORY,
+        async_get_history,
+        schema=GET_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_START_DISCOVERY,
+        async_start_discovery,
+        schema=DISCOVERY_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_STOP_DISCOVERY,
+        async_stop_discovery,
+        schema=DISCOVERY_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
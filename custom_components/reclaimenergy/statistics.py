@@ -0,0 +1,255 @@
+"""Hourly long-term statistics imported directly into the recorder.
+
+The recorder is only an after dependency of the integration, so it is
+imported when the statistics are enabled rather than with this module.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import math
+from typing import TYPE_CHECKING, NamedTuple
+
+from homeassistant.const import UnitOfEnergy, UnitOfPower, UnitOfTemperature, UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .reclaimv2 import ReclaimState
+
+if TYPE_CHECKING:
+    from homeassistant.components.recorder.models import StatisticMetaData
+
+    from .coordinator import ReclaimV2Coordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+HOUR = 3600
+
+# seconds a sample is assumed to hold for before the gap counts as missing data
+MAX_HOLD = 900
+
+
+class HourlyStatistic(NamedTuple):
+    """Aggregate of one hour, integral is in value seconds."""
+
+    start: float
+    mean: float
+    min: float
+    max: float
+    integral: float
+
+
+class HourlyAggregator:
+    """Time weighted hourly mean, min, max and integral of a sampled value.
+
+    Each sample holds until the next one, for at most max_hold seconds, so
+    the slow and fast poll intervals are weighted correctly.
+    """
+
+    def __init__(self, max_hold: float = MAX_HOLD) -> None:
+        """Initialise aggregator."""
+        self.max_hold = max_hold
+        self._last: tuple[float, float] | None = None
+        self._start: float | None = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self._integral = 0.0
+        self._covered = 0.0
+        self._min = math.inf
+        self._max = -math.inf
+
+    def _close(self, done: list[HourlyStatistic]) -> None:
+        """Finish the current hour and move to the next one."""
+        if self._min <= self._max:
+            mean = self._integral / self._covered if self._covered else self._min
+            done.append(
+                HourlyStatistic(self._start, mean, self._min, self._max, self._integral)
+            )
+        self._start += HOUR
+        self._reset()
+
+    def add(self, timestamp: float, value: float) -> list[HourlyStatistic]:
+        """Add a sample, return the hours completed by it."""
+        done: list[HourlyStatistic] = []
+        if self._last is not None:
+            now, held = self._last
+            end = min(timestamp, now + self.max_hold)
+            while now < end:
+                segment = min(end, self._start + HOUR) - now
+                self._integral += held * segment
+                self._covered += segment
+                now += segment
+                if now >= self._start + HOUR:
+                    self._close(done)
+                    if now < end:
+                        self._min = self._max = held
+
+        if self._start is not None and timestamp >= self._start + HOUR:
+            # gap longer than max_hold
+            self._close(done)
+        if self._start is None or timestamp >= self._start + HOUR:
+            self._start = timestamp - timestamp % HOUR
+            self._reset()
+
+        self._min = min(self._min, value)
+        self._max = max(self._max, value)
+        self._last = (timestamp, value)
+        return done
+
+
+class StatisticDescription(NamedTuple):
+    """A statistic compiled from a register."""
+
+    key: str
+    name: str
+    register: str
+    unit: str
+    # mean: hourly mean/min/max, energy: integral of power in W,
+    # counter: a total increasing register
+    kind: str
+    # unit class of the recorder's unit converter for unit
+    unit_class: str
+
+
+STATISTICS: tuple[StatisticDescription, ...] = (
+    StatisticDescription(
+        "water",
+        "Water temperature",
+        "water",
+        UnitOfTemperature.CELSIUS,
+        "mean",
+        "temperature",
+    ),
+    StatisticDescription(
+        "ambient",
+        "Ambient temperature",
+        "ambient",
+        UnitOfTemperature.CELSIUS,
+        "mean",
+        "temperature",
+    ),
+    StatisticDescription("power", "Power", "power", UnitOfPower.WATT, "mean", "power"),
+    StatisticDescription(
+        "energy", "Energy", "power", UnitOfEnergy.KILO_WATT_HOUR, "energy", "energy"
+    ),
+    StatisticDescription(
+        "compressor_hours",
+        "Compressor hours",
+        "hours",
+        UnitOfTime.HOURS,
+        "counter",
+        "duration",
+    ),
+)
+
+
+class ReclaimStatistics:
+    """Compile hourly statistics of a unit and import them into the recorder.
+
+    This replaces the statistics the recorder would compile from the state
+    history of the sensors, so the raw sensors can be excluded from it.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator: ReclaimV2Coordinator):
+        """Initialise statistics."""
+        self.hass = hass
+        self.title = coordinator.config_entry.title
+        self.unique_id = coordinator.api.unique_id
+        self._aggregators = {
+            description.key: HourlyAggregator() for description in STATISTICS
+        }
+        # running totals of the sum statistics
+        self._sums: dict[str, float] = {}
+        self._counters: dict[str, float] = {}
+
+    def statistic_id(self, description: StatisticDescription) -> str:
+        """Return the external statistic id."""
+        return f"{DOMAIN}:{self.unique_id}_{description.key}"
+
+    async def async_load(self) -> None:
+        """Continue the sum statistics from the last imported hour."""
+        from homeassistant.components.recorder.statistics import get_last_statistics
+        from homeassistant.components.recorder.util import get_instance
+
+        for description in STATISTICS:
+            if description.kind == "mean":
+                continue
+            statistic_id = self.statistic_id(description)
+            last = await get_instance(self.hass).async_add_executor_job(
+                get_last_statistics, self.hass, 1, statistic_id, False, {"sum", "state"}
+            )
+            if rows := last.get(statistic_id):
+                self._sums[description.key] = rows[0].get("sum") or 0.0
+                if description.kind == "counter" and rows[0].get("state") is not None:
+                    self._counters[description.key] = rows[0]["state"]
+
+    def add(self, timestamp: float, state: ReclaimState) -> None:
+        """Add a packet and import any hours it completes."""
+        for description in STATISTICS:
+            with contextlib.suppress(AttributeError):
+                value = getattr(state, description.register)
+                if hours := self._aggregators[description.key].add(timestamp, value):
+                    self._import(description, hours)
+
+    def _import(
+        self, description: StatisticDescription, hours: list[HourlyStatistic]
+    ) -> None:
+        from homeassistant.components.recorder.models import StatisticData
+        from homeassistant.components.recorder.statistics import (
+            async_add_external_statistics,
+        )
+
+        statistics = []
+        for hour in hours:
+            start = dt_util.utc_from_timestamp(hour.start)
+            if description.kind == "mean":
+                statistics.append(
+                    StatisticData(
+                        start=start, mean=hour.mean, min=hour.min, max=hour.max
+                    )
+                )
+                continue
+
+            total = self._sums.get(description.key, 0.0)
+            if description.kind == "energy":
+                used = hour.integral / 3600 / 1000
+                state = used
+            else:
+                previous = self._counters.get(description.key, hour.min)
+                used = max(0.0, hour.max - previous)
+                self._counters[description.key] = state = hour.max
+            total += used
+            self._sums[description.key] = total
+            statistics.append(StatisticData(start=start, state=state, sum=total))
+
+        async_add_external_statistics(
+            self.hass, self._metadata(description), statistics
+        )
+        _LOGGER.debug(
+            "Imported %d hours of %s", len(statistics), self.statistic_id(description)
+        )
+
+    def _metadata(self, description: StatisticDescription) -> StatisticMetaData:
+        """Return the metadata of a statistic for the running recorder."""
+        from homeassistant.components.recorder import models
+
+        metadata = models.StatisticMetaData(
+            has_mean=description.kind == "mean",
+            has_sum=description.kind != "mean",
+            name=f"{self.title} {description.name}",
+            source=DOMAIN,
+            statistic_id=self.statistic_id(description),
+            unit_of_measurement=description.unit,
+        )
+        # newer recorders replace has_mean with mean_type and add unit_class
+        if (mean_type := getattr(models, "StatisticMeanType", None)) is not None:
+            metadata["mean_type"] = (
+                mean_type.ARITHMETIC if description.kind == "mean" else mean_type.NONE
+            )
+            del metadata["has_mean"]
+        if "unit_class" in models.StatisticMetaData.__annotations__:
+            metadata["unit_class"] = description.unit_class
+        return metadata
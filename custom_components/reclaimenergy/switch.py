@@ -1,44 +1,66 @@
 """Switch for Heat Pump Boost mode."""
 
+from dataclasses import dataclass
 import logging
 from typing import Any
 
-from homeassistant.components.switch import SwitchDeviceClass, SwitchEntity
+from homeassistant.components.switch import (
+    SwitchDeviceClass,
+    SwitchEntity,
+    SwitchEntityDescription,
+)
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .entity import ReclaimV2Entity
+from .entity import ReclaimV2EntityDescription, ReclaimV2RegisterEntity
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True, kw_only=True)
+class ReclaimV2SwitchEntityDescription(
+    SwitchEntityDescription, ReclaimV2EntityDescription
+):
+    """Describes a boolean register."""
+
+
+SWITCHES: tuple[ReclaimV2SwitchEntityDescription, ...] = (
+    ReclaimV2SwitchEntityDescription(
+        key="boost_switch",
+        translation_key="boost_switch",
+        register="boost",
+        device_class=SwitchDeviceClass.SWITCH,
+        icon="mdi:rocket",
+    ),
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
-    """Set up the binary_sensor platform."""
-    async_add_entities([BoostSwitch(coordinator=entry.runtime_data)])
+    """Set up the switch platform."""
+    async_add_entities(
+        ReclaimV2Switch(entry.runtime_data, description) for description in SWITCHES
+    )
 
 
-class BoostSwitch(ReclaimV2Entity, SwitchEntity):
-    """Represents the boost state of the heat pump."""
+class ReclaimV2Switch(ReclaimV2RegisterEntity, SwitchEntity):
+    """Represents a boolean setting of the heat pump."""
 
-    _attr_device_class = SwitchDeviceClass.SWITCH
-    _attr_translation_key = "boost_switch"
-    _attr_icon = "mdi:rocket"
+    entity_description: ReclaimV2SwitchEntityDescription
 
     @callback
-    def _handle_coordinator_update(self) -> None:
-        if hasattr(self.coordinator.data, "boost"):
-            self._attr_is_on = self.coordinator.data.boost
-            self.async_write_ha_state()
+    def _update_value(self, value: Any) -> None:
+        self._attr_is_on = value
+        self.async_write_ha_state()
 
     async def async_turn_on(self, **kwargs: Any) -> None:
-        """Turn on Boost Mode."""
-        await self.coordinator.api.set_value("boost", True)
+        """Turn on."""
+        await self._async_write_register(True)
 
     async def async_turn_off(self, **kwargs: Any) -> None:
-        """Turn off Boost Mode."""
-        await self.coordinator.api.set_value("boost", False)
+        """Turn off."""
+        await self._async_write_register(False)
@@ -1,19 +1,41 @@
 """Timer settings for Heat Pump."""
 
+from dataclasses import dataclass
 from datetime import time
 import logging
+from typing import Any
 
-from homeassistant.components.time import TimeEntity
+from homeassistant.components.time import TimeEntity, TimeEntityDescription
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ServiceValidationError
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .entity import ReclaimV2Entity
+from .entity import ReclaimV2EntityDescription, ReclaimV2RegisterEntity
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True, kw_only=True)
+class ReclaimV2TimeEntityDescription(TimeEntityDescription, ReclaimV2EntityDescription):
+    """Describes a register holding a start hour."""
+
+    entity_registry_enabled_default: bool = False
+
+
+TIMES: tuple[ReclaimV2TimeEntityDescription, ...] = tuple(
+    ReclaimV2TimeEntityDescription(key=key, translation_key=key)
+    for key in (
+        "mode5_timer1_start",
+        "mode5_timer2_start",
+        "mode6_timer1_start",
+        "mode6_timer2_start",
+        "mode7_start",
+        "mode8_start",
+    )
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
@@ -21,69 +43,24 @@ async def async_setup_entry(
 ) -> None:
     """Set up the time platform."""
     async_add_entities(
-        [
-            Mode5Timer1Start(coordinator=entry.runtime_data),
-            Mode5Timer2Start(coordinator=entry.runtime_data),
-            Mode6Timer1Start(coordinator=entry.runtime_data),
-            Mode6Timer2Start(coordinator=entry.runtime_data),
-            Mode7Start(coordinator=entry.runtime_data),
-            Mode8Start(coordinator=entry.runtime_data),
-        ]
+        ReclaimV2Time(entry.runtime_data, description) for description in TIMES
     )
 
 
-class ReclaimV2TimerBase(ReclaimV2Entity, TimeEntity):
+class ReclaimV2Time(ReclaimV2RegisterEntity, TimeEntity):
     """Represents the timer parameters of the heat pump."""
 
-    _attr_entity_registry_enabled_default = False
+    entity_description: ReclaimV2TimeEntityDescription
+
     _attr_native_value = time(hour=0)
 
     @callback
-    def _handle_coordinator_update(self) -> None:
-        if hasattr(self.coordinator.data, self._attr_translation_key):
-            self._attr_native_value = time(
-                hour=getattr(self.coordinator.data, self._attr_translation_key)
-            )
-            self.async_write_ha_state()
+    def _update_value(self, value: Any) -> None:
+        self._attr_native_value = None if value is None else time(hour=value)
+        self.async_write_ha_state()
 
     async def async_set_value(self, value: time) -> None:
         """Set timer start."""
         if value.minute != 0 or value.second != 0:
             raise ServiceValidationError("Only whole hours are permitted")
-        await self.coordinator.api.set_value(self._attr_translation_key, value.hour)
-
-
-class Mode5Timer1Start(ReclaimV2TimerBase):
-    """Represents the timer parameters of the heat pump."""
-
-    _attr_translation_key = "mode5_timer1_start"
-
-
-class Mode5Timer2Start(ReclaimV2TimerBase):
-    """Represents the timer parameters of the heat pump."""
-
-    _attr_translation_key = "mode5_timer2_start"
-
-
-class Mode6Timer1Start(ReclaimV2TimerBase):
-    """Represents the timer parameters of the heat pump."""
-
-    _attr_translation_key = "mode6_timer1_start"
-
-
-class Mode6Timer2Start(ReclaimV2TimerBase):
-    """Represents the timer parameters of the heat pump."""
-
-    _attr_translation_key = "mode6_timer2_start"
-
-
-class Mode7Start(ReclaimV2TimerBase):
-    """Represents the timer parameters of the heat pump."""
-
-    _attr_translation_key = "mode7_start"
-
-
-class Mode8Start(ReclaimV2TimerBase):
-    """Represents the timer parameters of the heat pump."""
-
-    _attr_translation_key = "mode8_start"
+        await self._async_write_register(value.hour)
@@ -0,0 +1,138 @@
+"""Websocket API for dashboards following the registers of a unit.
+
+A subscription pushes the decoded registers which changed since the previous
+message, instead of one state stream per entity. The history command returns
+the packets buffered in memory by the coordinator in a single message, so
+recent values can be shown without querying the recorder.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+import contextlib
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ServiceValidationError
+
+from .const import DOMAIN
+from .coordinator import ReclaimV2Coordinator
+from .reclaimv2 import ReclaimState
+from .services import _get_coordinator
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_REGISTERS = "registers"
+ATTR_SINCE = "since"
+
+REGISTERS = vol.All([vol.In(ReclaimState.modbus_map)], vol.Length(min=1))
+
+
+def decode(data: dict[int, int], names: Iterable[str]) -> dict[str, Any]:
+    """Return the decoded values of the named registers present in data."""
+    state = ReclaimState(data)
+    values = {}
+    for name in names:
+        with contextlib.suppress(AttributeError):
+            values[name] = getattr(state, name)
+    return values
+
+
+def _async_get_coordinator(
+    connection: websocket_api.ActiveConnection, msg: dict[str, Any]
+) -> ReclaimV2Coordinator | None:
+    """Return the coordinator of the requested entry or send an error."""
+    try:
+        return _get_coordinator(connection.hass, msg[ATTR_CONFIG_ENTRY_ID])
+    except ServiceValidationError as e:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, str(e))
+        return None
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/subscribe",
+        vol.Required(ATTR_CONFIG_ENTRY_ID): str,
+        vol.Optional(ATTR_REGISTERS): REGISTERS,
+    }
+)
+@callback
+def websocket_subscribe(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Push the registers of a unit as they change.
+
+    The first event holds every known value, the following ones only the
+    values which changed and "available" when the availability changed.
+    """
+    if (coordinator := _async_get_coordinator(connection, msg)) is None:
+        return
+    names = msg.get(ATTR_REGISTERS) or list(ReclaimState.modbus_map)
+    sent: dict[str, Any] = {}
+    available: bool | None = None
+
+    @callback
+    def async_forward() -> None:
+        nonlocal available
+        event: dict[str, Any] = {}
+        if coordinator.last_update_success is not available:
+            available = event["available"] = coordinator.last_update_success
+        if coordinator.data is not None:
+            values = decode(coordinator.data.data, names)
+            changed = {
+                name: value
+                for name, value in values.items()
+                if name not in sent or sent[name] != value
+            }
+            if changed:
+                sent.update(changed)
+                event["values"] = changed
+        if event:
+            connection.send_message(websocket_api.event_message(msg["id"], event))
+
+    connection.subscriptions[msg["id"]] = coordinator.async_add_listener(async_forward)
+    connection.send_result(msg["id"])
+    async_forward()
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/history",
+        vol.Required(ATTR_CONFIG_ENTRY_ID): str,
+        vol.Optional(ATTR_REGISTERS): REGISTERS,
+        vol.Optional(ATTR_SINCE): vol.Coerce(float),
+    }
+)
+@callback
+def websocket_history(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Return the buffered packets of a unit received after since.
+
+    Each row holds the time in seconds since the epoch and the decoded
+    values of the requested registers in that packet.
+    """
+    if (coordinator := _async_get_coordinator(connection, msg)) is None:
+        return
+    names = msg.get(ATTR_REGISTERS) or list(ReclaimState.modbus_map)
+    since = msg.get(ATTR_SINCE, 0.0)
+    rows = []
+    for timestamp, data in coordinator.recent:
+        if timestamp <= since:
+            continue
+        if values := decode(data, names):
+            rows.append({"time": timestamp, "values": values})
+    connection.send_result(msg["id"], {"history": rows})
+
+
+@callback
+def async_setup_websocket_api(hass: HomeAssistant) -> None:
+    """Register the websocket commands."""
+    websocket_api.async_register_command(hass, websocket_subscribe)
+    websocket_api.async_register_command(hass, websocket_history)